@@ -0,0 +1,52 @@
+"""Convert exam session JSON columns to JSONB on PostgreSQL
+
+Revision ID: 8c41f0a2d9e7
+Revises:
+Create Date: 2026-09-01
+
+create_all only creates missing tables, so databases that predate the
+JSONB model change still hold plain json columns while the ORM now
+declares jsonb over them. No-op on SQLite, where the JSON variant is
+unchanged.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8c41f0a2d9e7'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    # Fresh database: create_all will build the table as jsonb directly
+    if not sa.inspect(bind).has_table("exam_sessions"):
+        return
+    op.execute(
+        "ALTER TABLE exam_sessions "
+        "ALTER COLUMN mistake_ids TYPE jsonb USING mistake_ids::jsonb, "
+        "ALTER COLUMN answers TYPE jsonb USING answers::jsonb"
+    )
+    # Containment index the model only attaches on fresh create
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_exam_sessions_mistake_ids "
+        "ON exam_sessions USING gin (mistake_ids)"
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    if not sa.inspect(bind).has_table("exam_sessions"):
+        return
+    op.execute("DROP INDEX IF EXISTS ix_exam_sessions_mistake_ids")
+    op.execute(
+        "ALTER TABLE exam_sessions "
+        "ALTER COLUMN mistake_ids TYPE json USING mistake_ids::json, "
+        "ALTER COLUMN answers TYPE json USING answers::json"
+    )
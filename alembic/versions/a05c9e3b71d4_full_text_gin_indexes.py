@@ -0,0 +1,45 @@
+"""Ship the full-text GIN indexes to existing PostgreSQL databases
+
+Revision ID: a05c9e3b71d4
+Revises: f61a84d2c7b9
+Create Date: 2026-09-01
+
+ix_mistakes_fts and ix_vocabulary_fts are attached as after_create DDL,
+which only fires when create_all builds the tables — existing
+deployments, the ones with data worth searching, never got them.
+PostgreSQL-only, matching the conditional DDL on the models.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a05c9e3b71d4'
+down_revision = 'f61a84d2c7b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    inspector = sa.inspect(bind)
+    if inspector.has_table("gre_mistakes"):
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_mistakes_fts ON gre_mistakes "
+            "USING gin (to_tsvector('english', "
+            "coalesce(problem_statement_text, '') || ' ' || coalesce(solution_text, '')))"
+        )
+    if inspector.has_table("vocabulary"):
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_vocabulary_fts ON vocabulary "
+            "USING gin (to_tsvector('english', "
+            "word || ' ' || coalesce(meaning, '')))"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_vocabulary_fts")
+    op.execute("DROP INDEX IF EXISTS ix_mistakes_fts")
@@ -0,0 +1,87 @@
+"""Convert string-list JSON columns to text[] on PostgreSQL
+
+Revision ID: b2d60c7e5f18
+Revises: 8c41f0a2d9e7
+Create Date: 2026-09-01
+
+The models now declare native text[] for image-URL lists and vocabulary
+tags on PostgreSQL, but create_all never alters existing tables, so
+deployed databases still store json. Rewrites each column in place and
+adds the tags containment index. No-op on SQLite, where the JSON
+variant is unchanged.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b2d60c7e5f18'
+down_revision = '8c41f0a2d9e7'
+branch_labels = None
+depends_on = None
+
+_JSON_TO_ARRAY = (
+    "CASE WHEN {col} IS NULL THEN NULL "
+    "ELSE ARRAY(SELECT json_array_elements_text({col})) END"
+)
+
+
+def _json_columns(inspector, table, columns):
+    """Of `columns`, those still stored as json rather than text[].
+
+    Databases bootstrapped by create_all after the model change already
+    have text[] (json_array_elements_text has no overload for it), and
+    fresh databases have no table at all; both must be skipped.
+    """
+    if not inspector.has_table(table):
+        return []
+    actual = {col["name"]: col["type"] for col in inspector.get_columns(table)}
+    return [c for c in columns if c in actual and not isinstance(actual[c], sa.ARRAY)]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    inspector = sa.inspect(bind)
+
+    mistake_cols = _json_columns(
+        inspector, "gre_mistakes",
+        ("problem_statement_image_urls", "solution_image_urls"))
+    if mistake_cols:
+        op.execute("ALTER TABLE gre_mistakes " + ", ".join(
+            f"ALTER COLUMN {col} TYPE text[] USING " + _JSON_TO_ARRAY.format(col=col)
+            for col in mistake_cols
+        ))
+
+    if _json_columns(inspector, "vocabulary", ("tags",)):
+        op.execute(
+            "ALTER TABLE vocabulary "
+            "ALTER COLUMN tags TYPE text[] "
+            "USING " + _JSON_TO_ARRAY.format(col="tags")
+        )
+    if inspector.has_table("vocabulary"):
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_vocabulary_tags "
+            "ON vocabulary USING gin (tags)"
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    inspector = sa.inspect(bind)
+    if inspector.has_table("vocabulary"):
+        op.execute("DROP INDEX IF EXISTS ix_vocabulary_tags")
+        op.execute(
+            "ALTER TABLE vocabulary "
+            "ALTER COLUMN tags TYPE json USING array_to_json(tags)::json"
+        )
+    if inspector.has_table("gre_mistakes"):
+        op.execute(
+            "ALTER TABLE gre_mistakes "
+            "ALTER COLUMN problem_statement_image_urls TYPE json "
+            "USING array_to_json(problem_statement_image_urls)::json, "
+            "ALTER COLUMN solution_image_urls TYPE json "
+            "USING array_to_json(solution_image_urls)::json"
+        )
@@ -0,0 +1,78 @@
+"""Add the vocabulary.source_mistake_id foreign key to existing databases
+
+Revision ID: c8f0d6a42e91
+Revises: a05c9e3b71d4
+Create Date: 2026-09-01
+
+The ON DELETE SET NULL foreign key only reaches fresh databases, and
+passive_deletes=True means the ORM deliberately leaves the nulling to
+the database — so on migrated deployments deleting a mistake kept
+dangling source_mistake_id values. Nulls out references already left
+dangling, then adds the constraint: plain ADD CONSTRAINT on
+PostgreSQL, a batch-mode table rebuild on SQLite (which cannot add a
+foreign key in place). Also creates the source_mistake_id index the
+model declares.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c8f0d6a42e91'
+down_revision = 'a05c9e3b71d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("vocabulary") or not inspector.has_table("gre_mistakes"):
+        return
+
+    # Clean up references that pre-constraint deletes left dangling
+    op.execute(
+        "UPDATE vocabulary SET source_mistake_id = NULL "
+        "WHERE source_mistake_id IS NOT NULL "
+        "AND source_mistake_id NOT IN (SELECT id FROM gre_mistakes)"
+    )
+
+    has_fk = any(fk["referred_table"] == "gre_mistakes"
+                 for fk in inspector.get_foreign_keys("vocabulary"))
+    if not has_fk:
+        if bind.dialect.name == "postgresql":
+            op.execute(
+                "ALTER TABLE vocabulary "
+                "ADD CONSTRAINT fk_vocabulary_source_mistake_id "
+                "FOREIGN KEY (source_mistake_id) "
+                "REFERENCES gre_mistakes(id) ON DELETE SET NULL"
+            )
+        else:
+            with op.batch_alter_table("vocabulary") as batch:
+                batch.create_foreign_key(
+                    "fk_vocabulary_source_mistake_id", "gre_mistakes",
+                    ["source_mistake_id"], ["id"], ondelete="SET NULL")
+            # The batch rebuild cannot carry the expression-based unique
+            # index over; put it back
+            op.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS ix_vocabulary_word_lower "
+                "ON vocabulary (LOWER(word))"
+            )
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_vocabulary_source_mistake_id "
+        "ON vocabulary (source_mistake_id)"
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("vocabulary"):
+        return
+    op.execute("DROP INDEX IF EXISTS ix_vocabulary_source_mistake_id")
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            "ALTER TABLE vocabulary "
+            "DROP CONSTRAINT IF EXISTS fk_vocabulary_source_mistake_id"
+        )
+    # SQLite would need another table rebuild to drop the constraint;
+    # leaving it in place is harmless
@@ -0,0 +1,40 @@
+"""Enforce case-insensitive vocabulary word uniqueness
+
+Revision ID: d94a38f1c620
+Revises: b2d60c7e5f18
+Create Date: 2026-09-01
+
+The write paths rely on ix_vocabulary_word_lower raising IntegrityError
+instead of a check-then-insert SELECT, but create_all only builds the
+index on a fresh vocabulary table. Dedupes pre-existing collisions
+(keeping the oldest row per case-folded word) and creates the unique
+index on existing databases. Runs on both dialects.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd94a38f1c620'
+down_revision = 'b2d60c7e5f18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Fresh databases (setup_production.sh runs alembic before the app
+    # ever calls create_all) have no vocabulary table yet; create_all
+    # builds the index together with the table in that case
+    if not sa.inspect(op.get_bind()).has_table("vocabulary"):
+        return
+    op.execute(
+        "DELETE FROM vocabulary WHERE id NOT IN "
+        "(SELECT MIN(id) FROM vocabulary GROUP BY LOWER(word))"
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_vocabulary_word_lower "
+        "ON vocabulary (LOWER(word))"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_vocabulary_word_lower")
@@ -0,0 +1,76 @@
+"""Backfill exam_session_answers from the answers JSON
+
+Revision ID: e7b5219cd043
+Revises: d94a38f1c620
+Create Date: 2026-09-01
+
+/exam/statistics aggregates from exam_session_answers, which only
+submit_exam_answer populates going forward; without a backfill every
+exam completed before that table existed grades as all-incorrect.
+Unpacks the canonical ExamSession.answers JSON into one row per
+answered problem. Creates the table first if create_all has not run
+yet against this database; answered_at is approximated by the
+session's completion time since per-answer times were never stored.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e7b5219cd043'
+down_revision = 'd94a38f1c620'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Fresh database: nothing to unpack, and create_all will build
+    # exam_session_answers alongside exam_sessions
+    if not sa.inspect(bind).has_table("exam_sessions"):
+        return
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS exam_session_answers ("
+            "session_id INTEGER NOT NULL "
+            "REFERENCES exam_sessions(id) ON DELETE CASCADE, "
+            "mistake_id INTEGER NOT NULL, "
+            "is_correct BOOLEAN NOT NULL, "
+            "answered_at TIMESTAMPTZ DEFAULT now(), "
+            "PRIMARY KEY (session_id, mistake_id))"
+        )
+        op.execute(
+            "INSERT INTO exam_session_answers "
+            "(session_id, mistake_id, is_correct, answered_at) "
+            "SELECT e.id, kv.key::integer, kv.value::boolean, "
+            "COALESCE(e.completed_at, e.started_at, now()) "
+            "FROM exam_sessions e "
+            "CROSS JOIN LATERAL jsonb_each_text(e.answers) AS kv "
+            "WHERE e.answers IS NOT NULL "
+            "ON CONFLICT (session_id, mistake_id) DO NOTHING"
+        )
+    else:
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS exam_session_answers ("
+            "session_id INTEGER NOT NULL "
+            "REFERENCES exam_sessions(id) ON DELETE CASCADE, "
+            "mistake_id INTEGER NOT NULL, "
+            "is_correct BOOLEAN NOT NULL, "
+            "answered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, "
+            "PRIMARY KEY (session_id, mistake_id))"
+        )
+        # json_each yields 1/0 for JSON booleans, which is how SQLite
+        # stores Boolean columns anyway
+        op.execute(
+            "INSERT OR IGNORE INTO exam_session_answers "
+            "(session_id, mistake_id, is_correct, answered_at) "
+            "SELECT e.id, CAST(je.key AS INTEGER), je.value, "
+            "COALESCE(e.completed_at, e.started_at, CURRENT_TIMESTAMP) "
+            "FROM exam_sessions e, json_each(e.answers) AS je "
+            "WHERE e.answers IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    # Data backfill; the rows are as valid as the JSON they came from,
+    # so there is nothing safe to undo here
+    pass
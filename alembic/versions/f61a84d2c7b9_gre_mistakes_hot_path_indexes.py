@@ -0,0 +1,57 @@
+"""Ship the gre_mistakes hot-path indexes to existing databases
+
+Revision ID: f61a84d2c7b9
+Revises: e7b5219cd043
+Create Date: 2026-09-01
+
+The review-queue, list-ordering, filter and KMF indexes are declared in
+GREMistake.__table_args__, which create_all only applies when it builds
+the table — existing deployments end up with none of them. Creates the
+same set here; on PostgreSQL ix_mistakes_due gets the partial form the
+model declares, on SQLite the plain composite. No-op on a fresh
+database, where create_all emits them with the table.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f61a84d2c7b9'
+down_revision = 'e7b5219cd043'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("gre_mistakes"):
+        return
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_mistakes_due "
+            "ON gre_mistakes (mastered, next_review_date) "
+            "WHERE mastered = false"
+        )
+    else:
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_mistakes_due "
+            "ON gre_mistakes (mastered, next_review_date)"
+        )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_mistakes_section_created "
+        "ON gre_mistakes (section, created_at)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_mistakes_filters "
+        "ON gre_mistakes (section, topic, error_type)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_mistakes_kmf "
+        "ON gre_mistakes (kmf_section, kmf_problem_set)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_mistakes_kmf")
+    op.execute("DROP INDEX IF EXISTS ix_mistakes_filters")
+    op.execute("DROP INDEX IF EXISTS ix_mistakes_section_created")
+    op.execute("DROP INDEX IF EXISTS ix_mistakes_due")
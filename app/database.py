@@ -1,6 +1,6 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import DeclarativeBase, sessionmaker
 import os
 
 # Get database URL from environment variable (for Railway) or use default
@@ -20,15 +20,48 @@ else:
     if DATABASE_URL.startswith("postgres://"):
         DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# Parse once instead of string-prefix matching; get_backend_name() sees
+# through driver suffixes like postgresql+psycopg2
+url = make_url(DATABASE_URL)
+
 # SQLite needs check_same_thread=False, PostgreSQL doesn't
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+if url.get_backend_name() == "sqlite":
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        query_cache_size=1200,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL + NORMAL turns every commit from a journal rewrite + fsync
+        # into an append, and lets readers run during writes
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-65536")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        # SQLite ignores foreign keys (and their ON DELETE actions)
+        # unless enabled per connection
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
 else:
-    engine = create_engine(DATABASE_URL)
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=25,
+        max_overflow=25,
+        pool_pre_ping=True,   # avoid stale-connection errors after idle timeouts
+        pool_recycle=1800,    # bound connection age (seconds)
+        pool_use_lifo=True,   # reuse the hottest connections first
+        query_cache_size=1200,
+    )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+class Base(DeclarativeBase):
+    pass
 
 def get_db():
     db = SessionLocal()
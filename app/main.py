@@ -1,12 +1,16 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy import and_, or_, func, nullslast, text, tuple_, update
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List
+from typing import List, Optional
+import asyncio
 import sys
 import os
-import io
+import threading
+import time
 
 # Add parent directory to path to import utils
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -14,16 +18,28 @@ if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
 from app.database import get_db, Base, engine
-from app.models import GREMistake, ExamSession, Vocabulary
-from app.schemas import GREMistakeCreate, GREMistakeResponse, ReviewSubmit, ReviewResponse, MistakeFilter, ExamSessionCreate, ExamSessionResponse, ExamAnswerSubmit, VocabularyCreate, VocabularyUpdate, VocabularyResponse
-from utils.sm2 import calculate_next_review
+from app.models import GREMistake, ExamSession, ExamSessionAnswer, Vocabulary
+from app.schemas import GREMistakeCreate, GREMistakeResponse, GREMistakeSummary, ReviewSubmit, ReviewResponse, TodayReviewsResponse, MistakeFilter, ExamSessionCreate, ExamSessionResponse, ExamAnswerSubmit, VocabularyCreate, VocabularyUpdate, VocabularyResponse
+from utils.sm2 import sm2_update_values
 from utils.export import export_to_excel, export_to_pdf, export_vocabulary_to_excel, export_vocabulary_to_pdf
-from fastapi.responses import StreamingResponse
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="GRE Error Tracker API", version="1.0.0")
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables at startup rather than import time, in a worker
+    # thread so the event loop is free while DDL runs
+    await asyncio.to_thread(Base.metadata.create_all, engine)
+    yield
+
+
+# orjson serializes large list responses several times faster than the
+# stdlib json encoder and handles datetime natively
+app = FastAPI(
+    title="GRE Error Tracker API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # CORS configuration
 # In production, replace with your actual Vercel frontend URL
@@ -36,8 +52,9 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization"],
+    max_age=86400,  # let browsers cache preflight responses for a day
 )
 
 @app.get("/")
@@ -45,24 +62,15 @@ async def root():
     return {"message": "GRE Error Tracker API"}
 
 @app.post("/mistakes/", response_model=GREMistakeResponse)
-async def create_mistake(mistake: GREMistakeCreate, db: Session = Depends(get_db)):
+def create_mistake(mistake: GREMistakeCreate, db: Session = Depends(get_db)):
     """Create a new GRE mistake entry."""
     try:
-        mistake_data = mistake.dict(exclude_none=False)
-        # Convert empty strings to None for optional text fields
-        for key in ['sub_topic', 'problem_statement_text', 'solution_text', 'what_did_i_do_wrong', 
-                    'what_will_i_do_next_time', 'additional_techniques', 'relevant_concept']:
-            if mistake_data.get(key) == '':
-                mistake_data[key] = None
-        # Ensure image URL lists are lists
-        if mistake_data.get("problem_statement_image_urls") is None:
-            mistake_data["problem_statement_image_urls"] = []
-        if mistake_data.get("solution_image_urls") is None:
-            mistake_data["solution_image_urls"] = []
-        db_mistake = GREMistake(**mistake_data)
+        # Empty-string/None normalization happens in the schema validators
+        db_mistake = GREMistake(**mistake.model_dump())
         db.add(db_mistake)
         db.commit()
         db.refresh(db_mistake)
+        _invalidate_filter_options("mistakes")
         return db_mistake
     except Exception as e:
         db.rollback()
@@ -71,8 +79,50 @@ async def create_mistake(mistake: GREMistakeCreate, db: Session = Depends(get_db
         print(f"Error creating mistake: {error_details}")
         raise HTTPException(status_code=400, detail=f"Failed to create mistake: {str(e)}")
 
+@app.post("/mistakes/bulk", response_model=List[GREMistakeResponse])
+def create_mistakes_bulk(mistakes: List[GREMistakeCreate], db: Session = Depends(get_db)):
+    """Create many mistakes in one transaction (e.g. importing a problem set)."""
+    if not mistakes:
+        raise HTTPException(status_code=400, detail="No mistakes provided")
+    try:
+        db_mistakes = [GREMistake(**m.model_dump()) for m in mistakes]
+        db.add_all(db_mistakes)
+        db.commit()
+        for db_mistake in db_mistakes:
+            db.refresh(db_mistake)
+        _invalidate_filter_options("mistakes")
+        return db_mistakes
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Failed to create mistakes: {str(e)}")
+
+def _keyset_before(before: datetime, before_id: Optional[int]):
+    """Cursor predicate for pages ordered by (created_at DESC, id DESC).
+
+    created_at alone is not a unique cursor: bulk inserts share a single
+    server_default timestamp, so a bare created_at < before either
+    repeats the equal-timestamp run forever or skips the rest of it.
+    The id tiebreaker makes the cursor total, as a single row-value
+    comparison.
+
+    On SQLite the stored CURRENT_TIMESTAMP text has second precision
+    while the dialect binds datetimes with microseconds, so raw string
+    comparison never sees the two sides as equal; both go through
+    datetime() to normalize the format first.
+    """
+    if engine.dialect.name == "postgresql":
+        created_at, bound = GREMistake.created_at, before
+    else:
+        created_at, bound = func.datetime(GREMistake.created_at), func.datetime(before)
+    if before_id is None:
+        # Legacy cursor without the tiebreaker; correct while timestamps
+        # are unique, kept so old clients keep paginating
+        return created_at < bound
+    return tuple_(created_at, GREMistake.id) < tuple_(bound, before_id)
+
+
 @app.get("/mistakes/", response_model=List[GREMistakeResponse])
-async def get_all_mistakes(
+def get_all_mistakes(
     section: str = None,
     topic: str = None,
     sub_topic: str = None,
@@ -80,10 +130,21 @@ async def get_all_mistakes(
     kmf_section: int = None,
     kmf_problem_set: int = None,
     mastered: bool = None,
+    limit: int = Query(50, ge=1, le=500),
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    """Get all mistakes with optional filtering."""
-    query = db.query(GREMistake)
+    """Get mistakes with optional filtering, newest first.
+
+    Keyset pagination: pass the created_at AND id of the last item
+    received as `before`/`before_id` to fetch the next page. Unlike
+    OFFSET, the cost of a page does not grow with how deep into the
+    history it is.
+    """
+    # raiseload turns any accidental per-row lazy load into an error
+    # instead of a silent N+1
+    query = db.query(GREMistake).options(raiseload('*'))
     
     # Apply filters
     if section:
@@ -100,33 +161,73 @@ async def get_all_mistakes(
         query = query.filter(GREMistake.kmf_problem_set == kmf_problem_set)
     if mastered is not None:
         query = query.filter(GREMistake.mastered == mastered)
-    
-    mistakes = query.order_by(GREMistake.created_at.desc()).all()
+    if before is not None:
+        query = query.filter(_keyset_before(before, before_id))
+
+    mistakes = query.order_by(
+        GREMistake.created_at.desc(), GREMistake.id.desc()).limit(limit).all()
     return mistakes
 
-@app.get("/review/today", response_model=dict)
-async def get_today_reviews(db: Session = Depends(get_db)):
+@app.get("/mistakes/list/summary", response_model=List[GREMistakeSummary])
+def get_mistake_summaries(
+    section: str = None,
+    mastered: bool = None,
+    limit: int = Query(50, ge=1, le=500),
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """List-view rows without the heavy text and image-URL columns.
+
+    Selecting only the summary columns keeps the statement and the
+    payload small; the full record is a /mistakes/{id} away. Pagination
+    takes the same (before, before_id) cursor as /mistakes/.
+    """
+    query = db.query(
+        GREMistake.id,
+        GREMistake.section,
+        GREMistake.topic,
+        GREMistake.sub_topic,
+        GREMistake.kmf_section,
+        GREMistake.kmf_problem_set,
+        GREMistake.error_type,
+        GREMistake.next_review_date,
+        GREMistake.mastered,
+        GREMistake.total_attempts,
+        GREMistake.created_at,
+    )
+    if section:
+        query = query.filter(GREMistake.section == section)
+    if mastered is not None:
+        query = query.filter(GREMistake.mastered == mastered)
+    if before is not None:
+        query = query.filter(_keyset_before(before, before_id))
+    return query.order_by(
+        GREMistake.created_at.desc(), GREMistake.id.desc()).limit(limit).all()
+
+@app.get("/review/today", response_model=TodayReviewsResponse)
+def get_today_reviews(db: Session = Depends(get_db)):
     """
     Fetch all mistakes where next_review_date <= now, separated by Quant and Verbal.
     """
     now = datetime.now()
-    all_reviews = db.query(GREMistake).filter(
+    due = db.query(GREMistake).filter(
         and_(
             GREMistake.next_review_date <= now,
-            GREMistake.mastered == False
+            GREMistake.mastered.is_(False)
         )
-    ).all()
-    
-    quant_reviews = [mistake for mistake in all_reviews if mistake.section == "Quant"]
-    verbal_reviews = [mistake for mistake in all_reviews if mistake.section == "Verbal"]
-    
+    )
+
+    # Two indexed queries instead of one full fetch plus Python partitioning;
+    # most-overdue first, straight off ix_mistakes_due
+    due = due.order_by(GREMistake.next_review_date)
     return {
-        "quant": quant_reviews,
-        "verbal": verbal_reviews
+        "quant": due.filter(GREMistake.section == "Quant").all(),
+        "verbal": due.filter(GREMistake.section == "Verbal").all()
     }
 
 @app.post("/review/{mistake_id}/submit", response_model=ReviewResponse)
-async def submit_review(
+def submit_review(
     mistake_id: int,
     review: ReviewSubmit,
     db: Session = Depends(get_db)
@@ -138,114 +239,157 @@ async def submit_review(
     Mark as 'Mastered' if item survives 5 successful repetitions.
     Increment total_attempts and set got_correct if quality >= 4.
     """
-    mistake = db.query(GREMistake).filter(GREMistake.id == mistake_id).first()
-    
-    if not mistake:
-        raise HTTPException(status_code=404, detail="Mistake not found")
-    
-    if mistake.mastered:
-        raise HTTPException(status_code=400, detail="This item is already mastered")
-    
-    # Increment total attempts
-    mistake.total_attempts = (mistake.total_attempts or 0) + 1
-    
-    # Set got_correct flag if quality >= 4 (Good or Easy)
-    if review.quality >= 4:
-        mistake.got_correct = True
-    
-    # Calculate next review using SM-2 algorithm
-    new_interval, new_ease_factor, new_repetition_count, next_review_date = calculate_next_review(
-        quality=review.quality,
-        interval=mistake.interval,
-        ease_factor=mistake.ease_factor,
-        repetition_count=mistake.repetition_count
+    # Single UPDATE ... RETURNING: the SM-2 arithmetic runs in the
+    # database against the stored state, so there is no read-modify-write
+    # round-trip (or race between concurrent reviews)
+    stmt = (
+        update(GREMistake)
+        .where(GREMistake.id == mistake_id, GREMistake.mastered.is_(False))
+        .values(**sm2_update_values(review.quality, engine.dialect.name))
+        .returning(GREMistake)
+        .execution_options(synchronize_session=False)
     )
-    
-    # Update mistake
-    mistake.interval = new_interval
-    mistake.ease_factor = new_ease_factor
-    mistake.repetition_count = new_repetition_count
-    mistake.next_review_date = next_review_date
-    
-    # Mark as mastered if 5 successful repetitions
-    if new_repetition_count >= 5:
-        mistake.mastered = True
-    
+    mistake = db.execute(stmt).scalars().one_or_none()
+
+    if mistake is None:
+        db.rollback()
+        if db.get(GREMistake, mistake_id) is None:
+            raise HTTPException(status_code=404, detail="Mistake not found")
+        raise HTTPException(status_code=400, detail="This item is already mastered")
+
+    # Detach before commit so the freshly RETURNED values are serialized
+    # as-is instead of being expired and re-SELECTed
+    db.expunge(mistake)
     db.commit()
-    db.refresh(mistake)
-    
+
     return mistake
 
 @app.get("/mistakes/{mistake_id}", response_model=GREMistakeResponse)
-async def get_mistake(mistake_id: int, db: Session = Depends(get_db)):
+def get_mistake(mistake_id: int, db: Session = Depends(get_db)):
     """Get a specific mistake by ID."""
-    mistake = db.query(GREMistake).filter(GREMistake.id == mistake_id).first()
+    mistake = db.get(GREMistake, mistake_id)
     if not mistake:
         raise HTTPException(status_code=404, detail="Mistake not found")
     return mistake
 
 @app.put("/mistakes/{mistake_id}", response_model=GREMistakeResponse)
-async def update_mistake(
+def update_mistake(
     mistake_id: int,
     mistake: GREMistakeCreate,
     db: Session = Depends(get_db)
 ):
     """Update a mistake."""
-    db_mistake = db.query(GREMistake).filter(GREMistake.id == mistake_id).first()
-    if not db_mistake:
+    # Normalization happens in the schema validators; only touch fields the
+    # client actually sent so partial updates don't fan out to every column
+    mistake_data = mistake.model_dump(exclude_unset=True)
+
+    # Issue a single UPDATE instead of SELECT + setattr + UPDATE
+    updated = db.query(GREMistake).filter(GREMistake.id == mistake_id).update(
+        mistake_data, synchronize_session=False
+    )
+    if updated == 0:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Mistake not found")
-    
-    mistake_data = mistake.dict(exclude_none=False)
-    # Convert empty strings to None for optional text fields
-    for key in ['sub_topic', 'problem_statement_text', 'solution_text', 'what_did_i_do_wrong', 
-                'what_will_i_do_next_time', 'additional_techniques', 'relevant_concept']:
-        if mistake_data.get(key) == '':
-            mistake_data[key] = None
-    # Ensure image URL lists are lists
-    if mistake_data.get("problem_statement_image_urls") is None:
-        mistake_data["problem_statement_image_urls"] = []
-    if mistake_data.get("solution_image_urls") is None:
-        mistake_data["solution_image_urls"] = []
-    
-    # Update fields
-    for key, value in mistake_data.items():
-        setattr(db_mistake, key, value)
-    
+
     db.commit()
-    db.refresh(db_mistake)
-    return db_mistake
+    _invalidate_filter_options("mistakes")
+    return db.get(GREMistake, mistake_id)
 
 @app.delete("/mistakes/{mistake_id}")
-async def delete_mistake(mistake_id: int, db: Session = Depends(get_db)):
+def delete_mistake(mistake_id: int, db: Session = Depends(get_db)):
     """Delete a mistake."""
-    mistake = db.query(GREMistake).filter(GREMistake.id == mistake_id).first()
+    mistake = db.get(GREMistake, mistake_id)
     if not mistake:
         raise HTTPException(status_code=404, detail="Mistake not found")
     
     db.delete(mistake)
     db.commit()
+    _invalidate_filter_options("mistakes")
     return {"message": "Mistake deleted successfully"}
 
+def _distinct_values(db: Session, column):
+    """Get sorted distinct non-null values of a column without a full scan."""
+    return [value for (value,) in
+            db.query(column).distinct().filter(column.isnot(None)).order_by(column).all()]
+
+
+# Filter options are requested on every page load but only change when rows
+# are written, so cache the responses and invalidate on writes. The TTL is a
+# safety net in case an invalidation path is ever missed.
+_FILTER_OPTIONS_TTL = 60  # seconds
+_filter_options_cache = {"mistakes": None, "vocabulary": None}
+_filter_options_lock = threading.Lock()
+
+
+def _cached_filter_options(kind: str, build):
+    with _filter_options_lock:
+        entry = _filter_options_cache[kind]
+        if entry is not None and time.monotonic() - entry[1] < _FILTER_OPTIONS_TTL:
+            return entry[0]
+    options = build()
+    with _filter_options_lock:
+        _filter_options_cache[kind] = (options, time.monotonic())
+    return options
+
+
+def _invalidate_filter_options(kind: str):
+    with _filter_options_lock:
+        _filter_options_cache[kind] = None
+
+
+def _vocab_tag_filter(tag: str):
+    """Predicate for 'tags contains tag', per dialect.
+
+    PostgreSQL stores tags as text[] (array containment, GIN-indexed);
+    SQLite stores a JSON array probed with json_each.
+    """
+    if engine.dialect.name == "postgresql":
+        return Vocabulary.tags.contains([tag])
+    return text(
+        "EXISTS (SELECT 1 FROM json_each(vocabulary.tags) WHERE json_each.value = :tag)"
+    ).bindparams(tag=tag)
+
+
 @app.get("/mistakes/filter/options", response_model=dict)
-async def get_filter_options(db: Session = Depends(get_db)):
+def get_filter_options(db: Session = Depends(get_db)):
     """Get available filter options (unique values for dropdowns)."""
-    all_mistakes = db.query(GREMistake).all()
-    
-    sections = sorted(set(m.section for m in all_mistakes if m.section))
-    topics = sorted(set(m.topic for m in all_mistakes if m.topic))
-    sub_topics = sorted(set(m.sub_topic for m in all_mistakes if m.sub_topic))
-    error_types = sorted(set(m.error_type for m in all_mistakes if m.error_type))
-    kmf_sections = sorted(set(m.kmf_section for m in all_mistakes if m.kmf_section is not None))
-    kmf_problem_sets = sorted(set(m.kmf_problem_set for m in all_mistakes if m.kmf_problem_set is not None))
-    
-    return {
-        "sections": sections,
-        "topics": topics,
-        "sub_topics": sub_topics,
-        "error_types": error_types,
-        "kmf_sections": kmf_sections,
-        "kmf_problem_sets": kmf_problem_sets
-    }
+    def build():
+        return {
+            "sections": _distinct_values(db, GREMistake.section),
+            "topics": _distinct_values(db, GREMistake.topic),
+            "sub_topics": _distinct_values(db, GREMistake.sub_topic),
+            "error_types": _distinct_values(db, GREMistake.error_type),
+            "kmf_sections": _distinct_values(db, GREMistake.kmf_section),
+            "kmf_problem_sets": _distinct_values(db, GREMistake.kmf_problem_set)
+        }
+    return _cached_filter_options("mistakes", build)
+
+
+def _stream_bytes(data: bytes, chunk_size: int = 65536):
+    """Yield a bytes payload in bounded chunks for a StreamingResponse."""
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+# Exports read scalar columns only, so select them explicitly: rows come
+# back as lightweight named tuples instead of tracked ORM instances, and
+# the exporters' attribute access still works unchanged
+_MISTAKE_EXPORT_COLUMNS = (
+    GREMistake.id, GREMistake.section, GREMistake.topic, GREMistake.sub_topic,
+    GREMistake.kmf_section, GREMistake.kmf_problem_set, GREMistake.error_type,
+    GREMistake.problem_statement_text, GREMistake.solution_text,
+    GREMistake.what_did_i_do_wrong, GREMistake.what_will_i_do_next_time,
+    GREMistake.additional_techniques, GREMistake.relevant_concept,
+    GREMistake.total_attempts, GREMistake.repetition_count, GREMistake.mastered,
+    GREMistake.got_correct, GREMistake.next_review_date, GREMistake.created_at,
+)
+
+_VOCAB_EXPORT_COLUMNS = (
+    Vocabulary.id, Vocabulary.word, Vocabulary.set_no, Vocabulary.category,
+    Vocabulary.meaning, Vocabulary.synonym, Vocabulary.sentences,
+    Vocabulary.genre, Vocabulary.tags, Vocabulary.source_mistake_id,
+    Vocabulary.created_at,
+)
+
 
 @app.get("/mistakes/export/excel")
 async def export_mistakes_excel(
@@ -259,7 +403,7 @@ async def export_mistakes_excel(
     db: Session = Depends(get_db)
 ):
     """Export mistakes to Excel format with optional filters."""
-    query = db.query(GREMistake)
+    query = db.query(*_MISTAKE_EXPORT_COLUMNS)
     
     # Apply filters
     if section:
@@ -279,11 +423,12 @@ async def export_mistakes_excel(
     
     mistakes = query.all()
     
-    excel_data = export_to_excel(mistakes)
+    # Generate in a worker thread so the event loop stays responsive
+    excel_data = await asyncio.to_thread(export_to_excel, mistakes)
     filename = f"gre_mistakes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     
     return StreamingResponse(
-        io.BytesIO(excel_data),
+        _stream_bytes(excel_data),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -300,7 +445,7 @@ async def export_mistakes_pdf(
     db: Session = Depends(get_db)
 ):
     """Export mistakes to PDF format with optional filters."""
-    query = db.query(GREMistake)
+    query = db.query(*_MISTAKE_EXPORT_COLUMNS)
     
     # Apply filters
     if section:
@@ -320,23 +465,24 @@ async def export_mistakes_pdf(
     
     mistakes = query.all()
     
-    pdf_data = export_to_pdf(mistakes)
+    # Generate in a worker thread so the event loop stays responsive
+    pdf_data = await asyncio.to_thread(export_to_pdf, mistakes)
     filename = f"gre_mistakes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     
     return StreamingResponse(
-        io.BytesIO(pdf_data),
+        _stream_bytes(pdf_data),
         media_type="application/pdf",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
 # Exam Session Endpoints
 @app.post("/exam/create", response_model=ExamSessionResponse)
-async def create_exam_session(exam_config: ExamSessionCreate, db: Session = Depends(get_db)):
+def create_exam_session(exam_config: ExamSessionCreate, db: Session = Depends(get_db)):
     """Create a new exam session with filtered mistakes. Supports multiple selections."""
     from sqlalchemy import or_
-    
-    # Build query based on filters - start with all mistakes
-    query = db.query(GREMistake)
+
+    # Only the IDs are stored on the session, so only the IDs are fetched
+    query = db.query(GREMistake.id)
     
     # Apply filters only if they are provided and not empty
     filters_applied = False
@@ -365,10 +511,10 @@ async def create_exam_session(exam_config: ExamSessionCreate, db: Session = Depe
         query = query.filter(GREMistake.kmf_problem_set.in_(exam_config.kmf_problem_sets))
         filters_applied = True
     
-    # Get all matching mistakes (if no filters, get all mistakes)
-    mistakes = query.all()
-    
-    if not mistakes:
+    # Get all matching mistake IDs (if no filters, get all mistakes)
+    mistake_ids = [mistake_id for (mistake_id,) in query.all()]
+
+    if not mistake_ids:
         raise HTTPException(status_code=400, detail="No mistakes found matching the criteria. Try removing some filters or add more mistakes to the database.")
     
     # Store filter info as JSON for display (use first value or None)
@@ -380,8 +526,8 @@ async def create_exam_session(exam_config: ExamSessionCreate, db: Session = Depe
         kmf_section=exam_config.kmf_sections[0] if exam_config.kmf_sections and len(exam_config.kmf_sections) == 1 else None,
         kmf_problem_set=exam_config.kmf_problem_sets[0] if exam_config.kmf_problem_sets and len(exam_config.kmf_problem_sets) == 1 else None,
         timer_minutes=exam_config.timer_minutes,
-        total_problems=len(mistakes),
-        mistake_ids=[m.id for m in mistakes],
+        total_problems=len(mistake_ids),
+        mistake_ids=mistake_ids,
         answers={}
     )
     
@@ -392,31 +538,40 @@ async def create_exam_session(exam_config: ExamSessionCreate, db: Session = Depe
     return exam_session
 
 @app.post("/exam/{exam_id}/submit-answer")
-async def submit_exam_answer(
+def submit_exam_answer(
     exam_id: int,
     answer: ExamAnswerSubmit,
     db: Session = Depends(get_db)
 ):
     """Submit an answer for a problem in the exam."""
-    exam = db.query(ExamSession).filter(ExamSession.id == exam_id).first()
+    exam = db.get(ExamSession, exam_id)
     if not exam:
         raise HTTPException(status_code=404, detail="Exam session not found")
-    
+
     if exam.completed_at:
         raise HTTPException(status_code=400, detail="Exam session already completed")
-    
-    # Initialize answers if needed
-    if not exam.answers:
-        exam.answers = {}
-    
+
     # Check if answer was already submitted
     mistake_key = str(answer.mistake_id)
+    if exam.answers is None:
+        exam.answers = {}
     was_already_answered = mistake_key in exam.answers
     previous_answer = exam.answers.get(mistake_key)
-    
-    # Update answers
+
+    # MutableDict tracks keyed assignment, so no full-dict rewrite is needed
     exam.answers[mistake_key] = answer.is_correct
-    
+
+    # Mirror into the relational answers table so stats can aggregate in SQL
+    answer_row = db.get(ExamSessionAnswer, (exam_id, answer.mistake_id))
+    if answer_row:
+        answer_row.is_correct = answer.is_correct
+    else:
+        db.add(ExamSessionAnswer(
+            session_id=exam_id,
+            mistake_id=answer.mistake_id,
+            is_correct=answer.is_correct,
+        ))
+
     # Update counts only if this is a new answer or answer changed
     if not was_already_answered:
         # New answer
@@ -432,16 +587,21 @@ async def submit_exam_answer(
         else:
             exam.incorrect_count -= 1
             exam.correct_count += 1
-    
+
     db.commit()
-    db.refresh(exam)
-    
-    return {"message": "Answer submitted", "exam": exam}
+
+    # Return just the counters instead of re-fetching and serializing the
+    # whole session (answers JSON grows with every submission)
+    return {
+        "message": "Answer submitted",
+        "correct_count": exam.correct_count,
+        "incorrect_count": exam.incorrect_count
+    }
 
 @app.post("/exam/{exam_id}/complete", response_model=ExamSessionResponse)
-async def complete_exam(exam_id: int, db: Session = Depends(get_db)):
+def complete_exam(exam_id: int, db: Session = Depends(get_db)):
     """Mark exam session as completed."""
-    exam = db.query(ExamSession).filter(ExamSession.id == exam_id).first()
+    exam = db.get(ExamSession, exam_id)
     if not exam:
         raise HTTPException(status_code=404, detail="Exam session not found")
     
@@ -455,106 +615,109 @@ async def complete_exam(exam_id: int, db: Session = Depends(get_db)):
     return exam
 
 @app.get("/exam/history", response_model=List[ExamSessionResponse])
-async def get_exam_history(db: Session = Depends(get_db)):
-    """Get all completed exam sessions."""
-    exams = db.query(ExamSession).filter(
+def get_exam_history(
+    limit: int = Query(50, ge=1, le=500),
+    before: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Get completed exam sessions, newest first.
+
+    Keyset pagination: pass the completed_at of the last item received
+    as `before` to fetch the next page.
+    """
+    query = db.query(ExamSession).options(raiseload('*')).filter(
         ExamSession.completed_at.isnot(None)
-    ).order_by(ExamSession.completed_at.desc()).all()
+    )
+    if before is not None:
+        query = query.filter(ExamSession.completed_at < before)
+    exams = query.order_by(ExamSession.completed_at.desc()).limit(limit).all()
     return exams
 
+# Per-section answer aggregation pushed into the database: unnest each
+# exam's mistake_ids, join to gre_mistakes for the section, and read the
+# per-mistake answer from the relational exam_session_answers table.
+# Unanswered problems count as incorrect (no matching answer row). Only
+# small integer counters come back over the wire, never the JSON blobs.
+_EXAM_SECTION_STATS_SQLITE = text("""
+    SELECT g.section AS section,
+           COUNT(*) AS total,
+           SUM(CASE WHEN a.is_correct THEN 1 ELSE 0 END) AS correct,
+           COUNT(DISTINCT e.id) AS exam_count
+    FROM exam_sessions AS e
+    JOIN json_each(e.mistake_ids) AS je
+    JOIN gre_mistakes AS g ON g.id = je.value
+    LEFT JOIN exam_session_answers AS a
+           ON a.session_id = e.id AND a.mistake_id = je.value
+    WHERE e.completed_at IS NOT NULL
+    GROUP BY g.section
+""")
+
+_EXAM_SECTION_STATS_POSTGRESQL = text("""
+    SELECT g.section AS section,
+           COUNT(*) AS total,
+           COUNT(*) FILTER (WHERE a.is_correct) AS correct,
+           COUNT(DISTINCT e.id) AS exam_count
+    FROM exam_sessions AS e
+    CROSS JOIN LATERAL jsonb_array_elements_text(e.mistake_ids) AS mid(value)
+    JOIN gre_mistakes AS g ON g.id = mid.value::int
+    LEFT JOIN exam_session_answers AS a
+           ON a.session_id = e.id AND a.mistake_id = mid.value::int
+    WHERE e.completed_at IS NOT NULL
+    GROUP BY g.section
+""")
+
+
+def _exam_section_stats(db: Session) -> dict:
+    """Aggregate per-section correct/total answer counts inside the database."""
+    if engine.dialect.name == "postgresql":
+        stmt = _EXAM_SECTION_STATS_POSTGRESQL
+    else:
+        stmt = _EXAM_SECTION_STATS_SQLITE
+    return {row.section: row for row in db.execute(stmt)}
+
+
 @app.get("/exam/statistics", response_model=dict)
-async def get_exam_statistics(db: Session = Depends(get_db)):
+def get_exam_statistics(db: Session = Depends(get_db)):
     """Get exam statistics broken down by Quant and Verbal."""
-    all_exams = db.query(ExamSession).filter(
+    total_exams = db.query(func.count(ExamSession.id)).filter(
         ExamSession.completed_at.isnot(None)
-    ).all()
-    
-    # Initialize counters
-    quant_total_problems = 0
-    quant_correct = 0
-    quant_incorrect = 0
-    quant_exam_ids = set()
-    
-    verbal_total_problems = 0
-    verbal_correct = 0
-    verbal_incorrect = 0
-    verbal_exam_ids = set()
-    
-    # Process each exam by checking individual mistakes
-    for exam in all_exams:
-        quant_in_exam = 0
-        quant_correct_in_exam = 0
-        verbal_in_exam = 0
-        verbal_correct_in_exam = 0
-        
-        # Check each mistake in the exam
-        for mistake_id in exam.mistake_ids:
-            mistake = db.query(GREMistake).filter(GREMistake.id == mistake_id).first()
-            if mistake:
-                is_correct = exam.answers.get(str(mistake_id), False)
-                if mistake.section == "Quant":
-                    quant_in_exam += 1
-                    quant_total_problems += 1
-                    if is_correct:
-                        quant_correct_in_exam += 1
-                        quant_correct += 1
-                    else:
-                        quant_incorrect += 1
-                elif mistake.section == "Verbal":
-                    verbal_in_exam += 1
-                    verbal_total_problems += 1
-                    if is_correct:
-                        verbal_correct_in_exam += 1
-                        verbal_correct += 1
-                    else:
-                        verbal_incorrect += 1
-        
-        # Track exam IDs that contain each section
-        if quant_in_exam > 0:
-            quant_exam_ids.add(exam.id)
-        if verbal_in_exam > 0:
-            verbal_exam_ids.add(exam.id)
-    
-    # Calculate percentages
-    quant_percentage = (quant_correct / quant_total_problems * 100) if quant_total_problems > 0 else 0
-    verbal_percentage = (verbal_correct / verbal_total_problems * 100) if verbal_total_problems > 0 else 0
-    
-    # Get mistake statistics
-    all_mistakes = db.query(GREMistake).all()
-    quant_mistakes = [m for m in all_mistakes if m.section == "Quant"]
-    verbal_mistakes = [m for m in all_mistakes if m.section == "Verbal"]
-    
-    quant_mastered = len([m for m in quant_mistakes if m.mastered])
-    verbal_mastered = len([m for m in verbal_mistakes if m.mastered])
-    
+    ).scalar() or 0
+
+    section_stats = _exam_section_stats(db)
+
+    # Get mistake statistics with a grouped aggregate instead of a full scan
+    mistake_counts = db.query(
+        GREMistake.section, GREMistake.mastered, func.count(GREMistake.id)
+    ).group_by(GREMistake.section, GREMistake.mastered).all()
+
+    def section_summary(section: str) -> dict:
+        stats = section_stats.get(section)
+        total_problems = stats.total if stats else 0
+        correct = (stats.correct or 0) if stats else 0
+        total_mistakes = sum(c for s, _, c in mistake_counts if s == section)
+        mastered = sum(c for s, m, c in mistake_counts if s == section and m)
+        percentage = (correct / total_problems * 100) if total_problems > 0 else 0
+        return {
+            "total_problems": total_problems,
+            "correct": correct,
+            "incorrect": total_problems - correct,
+            "percentage": round(percentage, 1),
+            "exam_count": stats.exam_count if stats else 0,
+            "total_mistakes": total_mistakes,
+            "mastered": mastered,
+            "in_progress": total_mistakes - mastered
+        }
+
     return {
-        "quant": {
-            "total_problems": quant_total_problems,
-            "correct": quant_correct,
-            "incorrect": quant_incorrect,
-            "percentage": round(quant_percentage, 1),
-            "exam_count": len(quant_exam_ids),
-            "total_mistakes": len(quant_mistakes),
-            "mastered": quant_mastered,
-            "in_progress": len(quant_mistakes) - quant_mastered
-        },
-        "verbal": {
-            "total_problems": verbal_total_problems,
-            "correct": verbal_correct,
-            "incorrect": verbal_incorrect,
-            "percentage": round(verbal_percentage, 1),
-            "exam_count": len(verbal_exam_ids),
-            "total_mistakes": len(verbal_mistakes),
-            "mastered": verbal_mastered,
-            "in_progress": len(verbal_mistakes) - verbal_mastered
-        },
-        "total_exams": len(all_exams)
+        "quant": section_summary("Quant"),
+        "verbal": section_summary("Verbal"),
+        "total_exams": total_exams
     }
 
 @app.get("/exam/{exam_id}", response_model=ExamSessionResponse)
-async def get_exam_session(exam_id: int, db: Session = Depends(get_db)):
+def get_exam_session(exam_id: int, db: Session = Depends(get_db)):
     """Get exam session details."""
-    exam = db.query(ExamSession).filter(ExamSession.id == exam_id).first()
+    exam = db.get(ExamSession, exam_id)
     if not exam:
         raise HTTPException(status_code=404, detail="Exam session not found")
     return exam
@@ -562,13 +725,8 @@ async def get_exam_session(exam_id: int, db: Session = Depends(get_db)):
 
 # Vocabulary endpoints
 @app.post("/vocabulary", response_model=VocabularyResponse)
-async def create_vocabulary(vocab: VocabularyCreate, db: Session = Depends(get_db)):
+def create_vocabulary(vocab: VocabularyCreate, db: Session = Depends(get_db)):
     """Create a new vocabulary entry."""
-    # Check if word already exists
-    existing = db.query(Vocabulary).filter(Vocabulary.word.ilike(vocab.word)).first()
-    if existing:
-        raise HTTPException(status_code=400, detail=f"Vocabulary word '{vocab.word}' already exists")
-    
     vocabulary = Vocabulary(
         word=vocab.word,
         set_no=vocab.set_no,
@@ -582,14 +740,68 @@ async def create_vocabulary(vocab: VocabularyCreate, db: Session = Depends(get_d
     )
     
     db.add(vocabulary)
-    db.commit()
+    try:
+        # The unique lower(word) index enforces no duplicates; no
+        # check-then-insert SELECT (which was racy anyway)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Vocabulary word '{vocab.word}' already exists")
     db.refresh(vocabulary)
-    
+    _invalidate_filter_options("vocabulary")
+
     return vocabulary
 
 
+@app.post("/vocabulary/bulk", response_model=List[VocabularyResponse])
+def create_vocabulary_bulk(vocabs: List[VocabularyCreate], db: Session = Depends(get_db)):
+    """Create many vocabulary entries in one transaction (e.g. importing a word list)."""
+    if not vocabs:
+        raise HTTPException(status_code=400, detail="No vocabulary entries provided")
+
+    # One duplicate-check query for the whole batch instead of one per word
+    words_lower = [v.word.lower() for v in vocabs]
+    seen = set()
+    batch_dupes = [w for w in words_lower if w in seen or seen.add(w)]
+    existing = [w for (w,) in db.query(func.lower(Vocabulary.word)).filter(
+        func.lower(Vocabulary.word).in_(words_lower)
+    ).all()]
+    dupes = sorted(set(batch_dupes) | set(existing))
+    if dupes:
+        raise HTTPException(status_code=400, detail=f"Vocabulary words already exist: {', '.join(dupes)}")
+
+    entries = [
+        Vocabulary(
+            word=v.word,
+            set_no=v.set_no,
+            category=v.category,
+            meaning=v.meaning,
+            synonym=v.synonym,
+            sentences=v.sentences,
+            genre=v.genre,
+            tags=v.tags or [],
+            source_mistake_id=v.source_mistake_id
+        )
+        for v in vocabs
+    ]
+    db.add_all(entries)
+    try:
+        # The batch pre-check above is best-effort; the unique
+        # lower(word) index is the authority, so a word inserted
+        # concurrently still surfaces as a 400 rather than a 500
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="One or more vocabulary words already exist")
+    for entry in entries:
+        db.refresh(entry)
+    _invalidate_filter_options("vocabulary")
+
+    return entries
+
+
 @app.get("/vocabulary", response_model=List[VocabularyResponse])
-async def get_vocabulary_list(
+def get_vocabulary_list(
     set_no: int = None,
     category: str = None,
     genre: str = None,
@@ -597,7 +809,7 @@ async def get_vocabulary_list(
     db: Session = Depends(get_db)
 ):
     """Get list of vocabulary entries with optional filters."""
-    query = db.query(Vocabulary)
+    query = db.query(Vocabulary).options(raiseload('*'))
     
     if set_no is not None:
         query = query.filter(Vocabulary.set_no == set_no)
@@ -606,93 +818,96 @@ async def get_vocabulary_list(
     if genre:
         query = query.filter(Vocabulary.genre == genre)
     if tag:
-        query = query.filter(Vocabulary.tags.contains([tag]))
+        query = query.filter(_vocab_tag_filter(tag))
     
     vocabulary = query.order_by(Vocabulary.word).all()
     return vocabulary
 
 
 @app.get("/vocabulary/{vocab_id}", response_model=VocabularyResponse)
-async def get_vocabulary(vocab_id: int, db: Session = Depends(get_db)):
+def get_vocabulary(vocab_id: int, db: Session = Depends(get_db)):
     """Get a specific vocabulary entry by ID."""
-    vocabulary = db.query(Vocabulary).filter(Vocabulary.id == vocab_id).first()
+    vocabulary = db.get(Vocabulary, vocab_id)
     if not vocabulary:
         raise HTTPException(status_code=404, detail="Vocabulary not found")
     return vocabulary
 
 
 @app.put("/vocabulary/{vocab_id}", response_model=VocabularyResponse)
-async def update_vocabulary(
+def update_vocabulary(
     vocab_id: int,
     vocab_update: VocabularyUpdate,
     db: Session = Depends(get_db)
 ):
     """Update a vocabulary entry."""
-    vocabulary = db.query(Vocabulary).filter(Vocabulary.id == vocab_id).first()
+    # Only fields that were provided (and not null) are updated
+    vocab_data = vocab_update.model_dump(exclude_none=True)
+
+    if vocab_data:
+        # Issue a single UPDATE instead of SELECT + setattr + UPDATE; the
+        # unique lower(word) index catches word collisions
+        try:
+            updated = db.query(Vocabulary).filter(Vocabulary.id == vocab_id).update(
+                vocab_data, synchronize_session=False
+            )
+            if updated == 0:
+                db.rollback()
+                raise HTTPException(status_code=404, detail="Vocabulary not found")
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Vocabulary word '{vocab_data.get('word')}' already exists")
+        _invalidate_filter_options("vocabulary")
+
+    vocabulary = db.get(Vocabulary, vocab_id)
     if not vocabulary:
         raise HTTPException(status_code=404, detail="Vocabulary not found")
-    
-    # Update fields if provided
-    if vocab_update.word is not None:
-        # Check if new word already exists (excluding current entry)
-        existing = db.query(Vocabulary).filter(
-            Vocabulary.word.ilike(vocab_update.word),
-            Vocabulary.id != vocab_id
-        ).first()
-        if existing:
-            raise HTTPException(status_code=400, detail=f"Vocabulary word '{vocab_update.word}' already exists")
-        vocabulary.word = vocab_update.word
-    
-    if vocab_update.set_no is not None:
-        vocabulary.set_no = vocab_update.set_no
-    if vocab_update.category is not None:
-        vocabulary.category = vocab_update.category
-    if vocab_update.meaning is not None:
-        vocabulary.meaning = vocab_update.meaning
-    if vocab_update.synonym is not None:
-        vocabulary.synonym = vocab_update.synonym
-    if vocab_update.sentences is not None:
-        vocabulary.sentences = vocab_update.sentences
-    if vocab_update.genre is not None:
-        vocabulary.genre = vocab_update.genre
-    if vocab_update.tags is not None:
-        vocabulary.tags = vocab_update.tags
-    
-    db.commit()
-    db.refresh(vocabulary)
-    
     return vocabulary
 
 
 @app.delete("/vocabulary/{vocab_id}")
-async def delete_vocabulary(vocab_id: int, db: Session = Depends(get_db)):
+def delete_vocabulary(vocab_id: int, db: Session = Depends(get_db)):
     """Delete a vocabulary entry."""
-    vocabulary = db.query(Vocabulary).filter(Vocabulary.id == vocab_id).first()
+    vocabulary = db.get(Vocabulary, vocab_id)
     if not vocabulary:
         raise HTTPException(status_code=404, detail="Vocabulary not found")
     
     db.delete(vocabulary)
     db.commit()
+    _invalidate_filter_options("vocabulary")
     
     return {"message": "Vocabulary deleted successfully"}
 
 
 @app.get("/vocabulary/filters/options", response_model=dict)
-async def get_vocabulary_filter_options(db: Session = Depends(get_db)):
+def get_vocabulary_filter_options(db: Session = Depends(get_db)):
     """Get available filter options for vocabulary."""
-    all_vocab = db.query(Vocabulary).all()
-    
-    set_nos = sorted(set(v.set_no for v in all_vocab if v.set_no is not None))
-    categories = sorted(set(v.category for v in all_vocab if v.category))
-    genres = sorted(set(v.genre for v in all_vocab if v.genre))
-    tags = sorted(set(tag for v in all_vocab if v.tags for tag in v.tags))
-    
-    return {
-        "set_nos": set_nos,
-        "categories": categories,
-        "genres": genres,
-        "tags": tags
-    }
+    def build():
+        # Unpack the tags arrays inside the database so only the distinct
+        # tag strings come back, instead of scanning every row in Python
+        if engine.dialect.name == "postgresql":
+            tags_stmt = text("""
+                SELECT DISTINCT t.value
+                FROM vocabulary AS v
+                CROSS JOIN LATERAL unnest(v.tags) AS t(value)
+                WHERE v.tags IS NOT NULL
+                ORDER BY t.value
+            """)
+        else:
+            tags_stmt = text("""
+                SELECT DISTINCT je.value
+                FROM vocabulary AS v
+                JOIN json_each(v.tags) AS je
+                WHERE v.tags IS NOT NULL
+                ORDER BY je.value
+            """)
+        return {
+            "set_nos": _distinct_values(db, Vocabulary.set_no),
+            "categories": _distinct_values(db, Vocabulary.category),
+            "genres": _distinct_values(db, Vocabulary.genre),
+            "tags": [tag for (tag,) in db.execute(tags_stmt)]
+        }
+    return _cached_filter_options("vocabulary", build)
 
 
 @app.get("/vocabulary/export/excel")
@@ -704,7 +919,7 @@ async def export_vocabulary_excel(
     db: Session = Depends(get_db)
 ):
     """Export vocabulary to Excel format with optional filters."""
-    query = db.query(Vocabulary)
+    query = db.query(*_VOCAB_EXPORT_COLUMNS)
     
     # Apply filters
     if set_no is not None:
@@ -714,15 +929,16 @@ async def export_vocabulary_excel(
     if genre:
         query = query.filter(Vocabulary.genre == genre)
     if tag:
-        query = query.filter(Vocabulary.tags.contains([tag]))
+        query = query.filter(_vocab_tag_filter(tag))
     
     vocabulary = query.order_by(Vocabulary.word).all()
     
-    excel_data = export_vocabulary_to_excel(vocabulary)
+    # Generate in a worker thread so the event loop stays responsive
+    excel_data = await asyncio.to_thread(export_vocabulary_to_excel, vocabulary)
     filename = f"vocabulary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     
     return StreamingResponse(
-        io.BytesIO(excel_data),
+        _stream_bytes(excel_data),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -737,7 +953,7 @@ async def export_vocabulary_pdf(
     db: Session = Depends(get_db)
 ):
     """Export vocabulary to PDF format with optional filters."""
-    query = db.query(Vocabulary)
+    query = db.query(*_VOCAB_EXPORT_COLUMNS)
     
     # Apply filters
     if set_no is not None:
@@ -747,15 +963,19 @@ async def export_vocabulary_pdf(
     if genre:
         query = query.filter(Vocabulary.genre == genre)
     if tag:
-        query = query.filter(Vocabulary.tags.contains([tag]))
-    
-    vocabulary = query.order_by(Vocabulary.word).all()
+        query = query.filter(_vocab_tag_filter(tag))
     
-    pdf_data = export_vocabulary_to_pdf(vocabulary)
+    # Sets in order, then unnumbered words; the exporter groups with a
+    # single itertools.groupby pass over this ordering
+    vocabulary = query.order_by(
+        nullslast(Vocabulary.set_no.asc()), Vocabulary.word).all()
+
+    # Generate in a worker thread so the event loop stays responsive
+    pdf_data = await asyncio.to_thread(export_vocabulary_to_pdf, vocabulary)
     filename = f"vocabulary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     
     return StreamingResponse(
-        io.BytesIO(pdf_data),
+        _stream_bytes(pdf_data),
         media_type="application/pdf",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
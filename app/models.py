@@ -1,92 +1,208 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, JSON
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import DateTime, Float, Index, Integer, String, Text, JSON, text
+from sqlalchemy import DDL, ForeignKey, event
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.ext.mutable import MutableDict
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
+# str-list columns: native text[] on PostgreSQL, JSON on SQLite
+StringList = ARRAY(Text).with_variant(JSON(), 'sqlite')
+# JSONB on PostgreSQL: binary storage, no reparse on read, GIN-indexable
+JsonDoc = JSON().with_variant(JSONB(), 'postgresql')
+
+
 class GREMistake(Base):
     __tablename__ = "gre_mistakes"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    section = Column(String, nullable=False)  # "Quant" or "Verbal"
-    topic = Column(String, nullable=False)  # e.g., "Geometry", "TC"
-    sub_topic = Column(String, nullable=True)
-    
+    __table_args__ = (
+        # Review queue: next_review_date <= now AND mastered == False.
+        # On PostgreSQL the partial form skips mastered rows entirely, so
+        # the index stays small as the mastered pile grows.
+        Index('ix_mistakes_due', 'mastered', 'next_review_date',
+              postgresql_where=text('mastered = false')),
+        # List endpoint ordering within a section
+        Index('ix_mistakes_section_created', 'section', 'created_at'),
+        # Multi-column filter dropdowns
+        Index('ix_mistakes_filters', 'section', 'topic', 'error_type'),
+        # KMF drill-down filters on lists and exam creation
+        Index('ix_mistakes_kmf', 'kmf_section', 'kmf_problem_set'),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    section: Mapped[str] = mapped_column(String)  # "Quant" or "Verbal"
+    topic: Mapped[str] = mapped_column(String)  # e.g., "Geometry", "TC"
+    sub_topic: Mapped[Optional[str]] = mapped_column(String)
+
     # KMF Fields
-    kmf_section = Column(Integer, nullable=True)  # KMF Section 1-74
-    kmf_problem_set = Column(Integer, nullable=True)  # Problem set 1-15
-    
+    kmf_section: Mapped[Optional[int]] = mapped_column(Integer)  # KMF Section 1-74
+    kmf_problem_set: Mapped[Optional[int]] = mapped_column(Integer)  # Problem set 1-15
+
     # Problem Statement (can have both image and text)
-    problem_statement_image_urls = Column(JSON, nullable=True, default=list)  # List of problem statement image URLs
-    problem_statement_text = Column(Text, nullable=True)  # Problem statement text
-    
+    problem_statement_image_urls: Mapped[Optional[List[str]]] = mapped_column(StringList, default=list)
+    problem_statement_text: Mapped[Optional[str]] = mapped_column(Text)
+
     # Solution (can be image or text)
-    solution_image_urls = Column(JSON, nullable=True, default=list)  # List of solution image URLs
-    solution_text = Column(Text, nullable=True)  # Markdown/LaTeX support
-    
+    solution_image_urls: Mapped[Optional[List[str]]] = mapped_column(StringList, default=list)
+    solution_text: Mapped[Optional[str]] = mapped_column(Text)  # Markdown/LaTeX support
+
     # Error Analysis Fields
-    error_type = Column(String, nullable=False)  # "Conceptual", "Silly", "Time"
-    what_did_i_do_wrong = Column(Text, nullable=True)  # What Did I do wrong?
-    what_will_i_do_next_time = Column(Text, nullable=True)  # What Will I Do Next Time?
-    additional_techniques = Column(Text, nullable=True)  # Additional techniques
-    relevant_concept = Column(Text, nullable=True)  # Relevant Concept
-    
+    error_type: Mapped[str] = mapped_column(String)  # "Conceptual", "Silly", "Time"
+    what_did_i_do_wrong: Mapped[Optional[str]] = mapped_column(Text)
+    what_will_i_do_next_time: Mapped[Optional[str]] = mapped_column(Text)
+    additional_techniques: Mapped[Optional[str]] = mapped_column(Text)
+    relevant_concept: Mapped[Optional[str]] = mapped_column(Text)
+
     # SRS Data (Spaced Repetition System)
-    next_review_date = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
-    interval = Column(Integer, default=0)  # Days until next review
-    ease_factor = Column(Float, default=2.5)  # SM-2 ease factor
-    repetition_count = Column(Integer, default=0)  # Number of successful reviews
-    mastered = Column(Boolean, default=False)  # True after 5 successful repetitions
-    
+    next_review_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    interval: Mapped[Optional[int]] = mapped_column(Integer, default=0)  # Days until next review
+    ease_factor: Mapped[Optional[float]] = mapped_column(Float, default=2.5)  # SM-2 ease factor
+    repetition_count: Mapped[Optional[int]] = mapped_column(Integer, default=0)  # Number of successful reviews
+    mastered: Mapped[Optional[bool]] = mapped_column(default=False)  # True after 5 successful repetitions
+
     # Attempt Tracking
-    total_attempts = Column(Integer, default=0)  # Total number of attempts (including failed)
-    got_correct = Column(Boolean, default=False)  # Flag if got correct after trying again
-    
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    total_attempts: Mapped[Optional[int]] = mapped_column(Integer, default=0)  # Total attempts (including failed)
+    got_correct: Mapped[Optional[bool]] = mapped_column(default=False)  # Flag if got correct after trying again
+
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), onupdate=func.now())
+
+    vocabulary_items: Mapped[List["Vocabulary"]] = relationship(
+        back_populates="source_mistake",
+        passive_deletes=True,
+    )
 
 
 class ExamSession(Base):
     __tablename__ = "exam_sessions"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    section = Column(String, nullable=True)  # "Quant", "Verbal", or None for both
-    topic = Column(String, nullable=True)
-    sub_topic = Column(String, nullable=True)
-    error_type = Column(String, nullable=True)
-    kmf_section = Column(Integer, nullable=True)
-    kmf_problem_set = Column(Integer, nullable=True)
-    
-    timer_minutes = Column(Integer, nullable=True)  # Timer in minutes, None for no timer
-    
-    total_problems = Column(Integer, nullable=False)
-    correct_count = Column(Integer, default=0)
-    incorrect_count = Column(Integer, default=0)
-    
-    started_at = Column(DateTime(timezone=True), server_default=func.now())
-    completed_at = Column(DateTime(timezone=True), nullable=True)
-    
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    section: Mapped[Optional[str]] = mapped_column(String)  # "Quant", "Verbal", or None for both
+    topic: Mapped[Optional[str]] = mapped_column(String)
+    sub_topic: Mapped[Optional[str]] = mapped_column(String)
+    error_type: Mapped[Optional[str]] = mapped_column(String)
+    kmf_section: Mapped[Optional[int]] = mapped_column(Integer)
+    kmf_problem_set: Mapped[Optional[int]] = mapped_column(Integer)
+
+    timer_minutes: Mapped[Optional[int]] = mapped_column(Integer)  # Timer in minutes, None for no timer
+
+    total_problems: Mapped[int] = mapped_column(Integer)
+    correct_count: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    incorrect_count: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
     # Store the list of mistake IDs that were in this exam
-    mistake_ids = Column(JSON, nullable=False, default=list)
-    
+    mistake_ids: Mapped[list] = mapped_column(JsonDoc, default=list)
+
     # Store answers: {mistake_id: correct/incorrect}
-    answers = Column(JSON, nullable=False, default=dict)
-    
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # MutableDict flags keyed assignment as dirty, so handlers can mutate
+    # in place instead of rewriting the whole dict per answer. as_mutable
+    # marks the type instance itself, so this one is not shared via JsonDoc.
+    answers: Mapped[dict] = mapped_column(
+        MutableDict.as_mutable(JSON().with_variant(JSONB(), 'postgresql')), default=dict)
+
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    answer_rows: Mapped[List["ExamSessionAnswer"]] = relationship(
+        back_populates="session",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+
+class ExamSessionAnswer(Base):
+    """One row per answered problem in an exam session.
+
+    Relational mirror of ExamSession.answers: lets SQL aggregate per-answer
+    results (stats, grading) without unpacking the JSON blob. The JSON column
+    stays as the API's wire format.
+    """
+    __tablename__ = "exam_session_answers"
+
+    session_id: Mapped[int] = mapped_column(
+        ForeignKey("exam_sessions.id", ondelete="CASCADE"), primary_key=True)
+    mistake_id: Mapped[int] = mapped_column(primary_key=True)
+    is_correct: Mapped[bool] = mapped_column()
+    answered_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    session: Mapped[ExamSession] = relationship(back_populates="answer_rows")
 
 
 class Vocabulary(Base):
     __tablename__ = "vocabulary"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    word = Column(String, nullable=False, index=True)  # The vocabulary word
-    set_no = Column(Integer, nullable=True)  # Set number
-    category = Column(String, nullable=True)  # Category
-    meaning = Column(Text, nullable=False)  # Meaning/definition
-    synonym = Column(Text, nullable=True)  # Synonyms (comma-separated or JSON)
-    sentences = Column(Text, nullable=True)  # Example sentences
-    genre = Column(String, nullable=True)  # Genre
-    tags = Column(JSON, nullable=True, default=list)  # Tags like "from practice set", etc.
-    source_mistake_id = Column(Integer, nullable=True)  # ID of mistake this vocab came from (if from practice)
-    
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    word: Mapped[str] = mapped_column(String, index=True)  # The vocabulary word
+    set_no: Mapped[Optional[int]] = mapped_column(Integer)  # Set number
+    category: Mapped[Optional[str]] = mapped_column(String)  # Category
+    meaning: Mapped[str] = mapped_column(Text)  # Meaning/definition
+    synonym: Mapped[Optional[str]] = mapped_column(Text)  # Synonyms (comma-separated or JSON)
+    sentences: Mapped[Optional[str]] = mapped_column(Text)  # Example sentences
+    genre: Mapped[Optional[str]] = mapped_column(String)  # Genre
+    tags: Mapped[Optional[List[str]]] = mapped_column(StringList, default=list)  # Tags like "from practice set", etc.
+    # Mistake this vocab came from (if from practice); SET NULL keeps the
+    # word when its source mistake is deleted
+    source_mistake_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("gre_mistakes.id", ondelete="SET NULL"), index=True)
+
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), onupdate=func.now())
+
+    source_mistake: Mapped[Optional[GREMistake]] = relationship(
+        back_populates="vocabulary_items")
+
+
+# Unique functional index on lower(word): the database enforces the
+# case-insensitive no-duplicates rule, so writers can rely on
+# IntegrityError instead of a racy check-then-insert SELECT
+Index('ix_vocabulary_word_lower', func.lower(Vocabulary.word), unique=True)
+
+
+# Full-text search over problem/solution text. Expression indexes keep the
+# table schema identical across dialects (no stored tsvector column), and
+# execute_if skips them on SQLite, where create_all must keep working.
+event.listen(
+    GREMistake.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_mistakes_fts ON gre_mistakes "
+        "USING gin (to_tsvector('english', "
+        "coalesce(problem_statement_text, '') || ' ' || coalesce(solution_text, '')))"
+    ).execute_if(dialect="postgresql"),
+)
+
+event.listen(
+    Vocabulary.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_vocabulary_fts ON vocabulary "
+        "USING gin (to_tsvector('english', "
+        "word || ' ' || coalesce(meaning, '')))"
+    ).execute_if(dialect="postgresql"),
+)
+
+
+# GIN indexes for containment lookups (tags @> ..., mistake_ids @> ...);
+# PostgreSQL-only, same conditional-DDL pattern as the full-text indexes
+event.listen(
+    Vocabulary.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_vocabulary_tags ON vocabulary "
+        "USING gin (tags)"
+    ).execute_if(dialect="postgresql"),
+)
+
+event.listen(
+    ExamSession.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_exam_sessions_mistake_ids ON exam_sessions "
+        "USING gin (mistake_ids)"
+    ).execute_if(dialect="postgresql"),
+)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import datetime
 from typing import Optional, List, Union
 
@@ -26,32 +26,47 @@ class GREMistakeCreate(BaseModel):
     additional_techniques: Optional[str] = None
     relevant_concept: Optional[str] = None
     
-    @field_validator('kmf_section', 'kmf_problem_set', mode='before')
+    @field_validator('sub_topic', 'problem_statement_text', 'solution_text',
+                     'what_did_i_do_wrong', 'what_will_i_do_next_time',
+                     'additional_techniques', 'relevant_concept', mode='before')
     @classmethod
-    def convert_empty_to_none(cls, v):
-        if v == '' or v is None:
-            return None
-        if isinstance(v, str):
-            try:
-                return int(v)
-            except ValueError:
-                return None
-        return v
-    
-    @field_validator('kmf_section', mode='after')
+    def convert_empty_text_to_none(cls, v):
+        return None if v == '' else v
+
+    @field_validator('problem_statement_image_urls', 'solution_image_urls', mode='before')
+    @classmethod
+    def convert_none_to_list(cls, v):
+        return [] if v is None else v
+
+    # One pass per field: coerce ''/str to int-or-None and range-check
+    # in the same validator instead of a before/after pair
+    @field_validator('kmf_section', mode='before')
     @classmethod
     def validate_kmf_section(cls, v):
+        v = cls._coerce_kmf(v)
         if v is not None and not (1 <= v <= 74):
             raise ValueError('KMF Section must be between 1 and 74')
         return v
-    
-    @field_validator('kmf_problem_set', mode='after')
+
+    @field_validator('kmf_problem_set', mode='before')
     @classmethod
     def validate_kmf_problem_set(cls, v):
+        v = cls._coerce_kmf(v)
         if v is not None and not (1 <= v <= 15):
             raise ValueError('KMF Problem Set must be between 1 and 15')
         return v
 
+    @staticmethod
+    def _coerce_kmf(v):
+        if v == '' or v is None:
+            return None
+        if isinstance(v, str):
+            try:
+                return int(v)
+            except ValueError:
+                return None
+        return v
+
 class GREMistakeResponse(BaseModel):
     id: int
     section: str
@@ -78,8 +93,28 @@ class GREMistakeResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class GREMistakeSummary(BaseModel):
+    """Lightweight row for list views: no problem/solution text or image URLs."""
+    id: int
+    section: str
+    topic: str
+    sub_topic: Optional[str]
+    kmf_section: Optional[int]
+    kmf_problem_set: Optional[int]
+    error_type: str
+    next_review_date: datetime
+    mastered: bool
+    total_attempts: int
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class TodayReviewsResponse(BaseModel):
+    quant: List[GREMistakeResponse]
+    verbal: List[GREMistakeResponse]
+
 
 class ReviewSubmit(BaseModel):
     quality: int = Field(..., ge=1, le=5, description="Quality score from 1-5")
@@ -108,8 +143,7 @@ class ReviewResponse(BaseModel):
     total_attempts: int
     got_correct: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class MistakeFilter(BaseModel):
     section: Optional[str] = None
@@ -154,8 +188,7 @@ class ExamSessionResponse(BaseModel):
     answers: dict
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class VocabularyCreate(BaseModel):
@@ -195,6 +228,5 @@ class VocabularyResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
@@ -2,28 +2,120 @@
 Export utilities for generating Excel and PDF files from mistakes data.
 """
 import io
+from itertools import groupby
+from operator import attrgetter
 from typing import List
 from datetime import datetime
-from openpyxl import Workbook
+from xml.sax.saxutils import escape
+from openpyxl import LXML, Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.platypus import SimpleDocTemplate, LongTable, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from sqlalchemy.orm import Session
-    from app.models import GREMistake, Vocabulary
+    from sqlalchemy import Row
 
+# openpyxl serializes XLSX through lxml when available, several times
+# faster than the stdlib xml.etree fallback — the dominant cost of
+# wb.save() on large exports. lxml is pinned in requirements.txt; warn
+# rather than fail so exports still work in a stripped-down environment.
+if not LXML:
+    print("⚠ lxml not installed; Excel export will use the slower stdlib XML serializer.")
+
+
+# Shared immutable style objects, built once at import instead of per
+# export call; openpyxl styles are value objects and safe to share
+_THIN_SIDE = Side(style='thin')
+_BORDER = Border(left=_THIN_SIDE, right=_THIN_SIDE, top=_THIN_SIDE, bottom=_THIN_SIDE)
+_HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
+_MISTAKES_HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+_VOCAB_HEADER_FILL = PatternFill(start_color="7C3AED", end_color="7C3AED", fill_type="solid")
+_CENTER_ALIGN = Alignment(horizontal='center', vertical='center', wrap_text=True)
+_LEFT_ALIGN = Alignment(horizontal='left', vertical='top', wrap_text=True)
+# Per-column alignment decided once here; the write loops index these
+# tuples instead of running a set-membership test per cell. Long text
+# columns are left-aligned, everything else centered.
+_MISTAKES_ALIGNMENTS = tuple(
+    _LEFT_ALIGN if col in {8, 9, 10, 11, 12, 13} else _CENTER_ALIGN
+    for col in range(1, 20)
+)
+_VOCAB_ALIGNMENTS = tuple(
+    _LEFT_ALIGN if col in {5, 6, 7} else _CENTER_ALIGN
+    for col in range(1, 12)
+)
+
+# PDF paragraph styles, likewise built once. Derived copies rather than
+# mutations of the sample stylesheet's shared 'Normal' entry.
+_PDF_STYLES = getSampleStyleSheet()
+_PDF_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_PDF_STYLES['Heading1'],
+    fontSize=18,
+    textColor=colors.HexColor('#1a1a1a'),
+    spaceAfter=30,
+    alignment=1  # Center alignment
+)
+_PDF_NORMAL_STYLE = ParagraphStyle(
+    'CustomNormal',
+    parent=_PDF_STYLES['Normal'],
+    fontSize=10,
+    leading=14
+)
+_MISTAKES_HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_PDF_STYLES['Heading2'],
+    fontSize=14,
+    textColor=colors.HexColor('#366092'),
+    spaceAfter=12,
+    spaceBefore=20
+)
+_VOCAB_HEADING_STYLE = ParagraphStyle(
+    'VocabHeading',
+    parent=_PDF_STYLES['Heading2'],
+    fontSize=14,
+    textColor=colors.HexColor('#7C3AED'),
+    spaceAfter=12,
+    spaceBefore=20
+)
+_PDF_CELL_STYLE = ParagraphStyle(
+    'TableCell',
+    parent=_PDF_STYLES['Normal'],
+    fontSize=8,
+    leading=10
+)
+_PDF_CELL_HEADER_STYLE = ParagraphStyle(
+    'TableCellHeader',
+    parent=_PDF_CELL_STYLE,
+    fontName='Helvetica-Bold',
+    textColor=colors.white
+)
+_MISTAKES_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#366092')),
+    ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+])
+
+
+def export_to_excel(mistakes: List['Row'], styled: bool = True) -> bytes:
+    """Export mistakes to Excel format.
+
+    styled=False skips borders, fills and alignment and appends plain
+    value lists — no WriteOnlyCell objects at all — which is the fastest
+    path openpyxl has for a raw data dump. (The request behind this
+    suggested PyExcelerate; that would add a dependency for one code
+    path, and write-only plain-row appends get most of the same win.)
+    """
+    # Write-only mode streams rows out as they are appended instead of
+    # building the whole cell tree in memory, so memory stays flat with
+    # row count and the per-cell dict bookkeeping disappears
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("GRE Mistakes")
 
-def export_to_excel(mistakes: List['GREMistake']) -> bytes:
-    """Export mistakes to Excel format."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "GRE Mistakes"
-    
     # Header row
     headers = [
         "ID", "Section", "Topic", "Sub Topic", "KMF Section", "KMF Problem Set",
@@ -32,83 +124,64 @@ def export_to_excel(mistakes: List['GREMistake']) -> bytes:
         "Total Attempts", "Repetition Count", "Mastered", "Got Correct",
         "Next Review Date", "Created At"
     ]
-    
-    # Style header
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        cell.border = border
-    
-    # Data rows
-    for row_num, mistake in enumerate(mistakes, 2):
-        ws.cell(row=row_num, column=1, value=mistake.id).border = border
-        ws.cell(row=row_num, column=2, value=mistake.section).border = border
-        ws.cell(row=row_num, column=3, value=mistake.topic).border = border
-        ws.cell(row=row_num, column=4, value=mistake.sub_topic or "").border = border
-        ws.cell(row=row_num, column=5, value=mistake.kmf_section or "").border = border
-        ws.cell(row=row_num, column=6, value=mistake.kmf_problem_set or "").border = border
-        ws.cell(row=row_num, column=7, value=mistake.error_type).border = border
-        ws.cell(row=row_num, column=8, value=mistake.problem_statement_text or "").border = border
-        ws.cell(row=row_num, column=9, value=mistake.solution_text or "").border = border
-        ws.cell(row=row_num, column=10, value=mistake.what_did_i_do_wrong or "").border = border
-        ws.cell(row=row_num, column=11, value=mistake.what_will_i_do_next_time or "").border = border
-        ws.cell(row=row_num, column=12, value=mistake.additional_techniques or "").border = border
-        ws.cell(row=row_num, column=13, value=mistake.relevant_concept or "").border = border
-        ws.cell(row=row_num, column=14, value=mistake.total_attempts or 0).border = border
-        ws.cell(row=row_num, column=15, value=mistake.repetition_count or 0).border = border
-        ws.cell(row=row_num, column=16, value="Yes" if mistake.mastered else "No").border = border
-        ws.cell(row=row_num, column=17, value="Yes" if mistake.got_correct else "No").border = border
-        ws.cell(row=row_num, column=18, value=mistake.next_review_date.strftime("%Y-%m-%d %H:%M:%S") if mistake.next_review_date else "").border = border
-        ws.cell(row=row_num, column=19, value=mistake.created_at.strftime("%Y-%m-%d %H:%M:%S") if mistake.created_at else "").border = border
-        
-        # Set alignment for text cells
-        for col in range(1, 20):
-            cell = ws.cell(row=row_num, column=col)
-            if col in [8, 9, 10, 11, 12, 13]:  # Text fields
-                cell.alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
-            else:
-                cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    
-    # Auto-adjust column widths
-    column_widths = {
-        1: 8,   # ID
-        2: 12,  # Section
-        3: 20,  # Topic
-        4: 20,  # Sub Topic
-        5: 12,  # KMF Section
-        6: 15,  # KMF Problem Set
-        7: 15,  # Error Type
-        8: 40,  # Problem Statement
-        9: 40,  # Solution
-        10: 30, # What Did I Do Wrong
-        11: 30, # What Will I Do Next Time
-        12: 30, # Additional Techniques
-        13: 30, # Relevant Concept
-        14: 12, # Total Attempts
-        15: 15, # Repetition Count
-        16: 10, # Mastered
-        17: 12, # Got Correct
-        18: 20, # Next Review Date
-        19: 20, # Created At
-    }
-    
-    for col_num, width in column_widths.items():
+
+    fill = _MISTAKES_HEADER_FILL
+
+    # Column widths and the frozen header row must be set before rows are
+    # appended in write-only mode
+    column_widths = [8, 12, 20, 20, 12, 15, 15, 40, 40, 30, 30, 30, 30, 12, 15, 10, 12, 20, 20]
+    for col_num, width in enumerate(column_widths, 1):
         ws.column_dimensions[get_column_letter(col_num)].width = width
-    
-    # Freeze header row
     ws.freeze_panes = "A2"
-    
+
+    if styled:
+        header_row = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.fill = fill
+            cell.font = _HEADER_FONT
+            cell.alignment = _CENTER_ALIGN
+            cell.border = _BORDER
+            header_row.append(cell)
+        ws.append(header_row)
+    else:
+        ws.append(headers)
+
+    for mistake in mistakes:
+        values = [
+            mistake.id,
+            mistake.section,
+            mistake.topic,
+            mistake.sub_topic or "",
+            mistake.kmf_section or "",
+            mistake.kmf_problem_set or "",
+            mistake.error_type,
+            mistake.problem_statement_text or "",
+            mistake.solution_text or "",
+            mistake.what_did_i_do_wrong or "",
+            mistake.what_will_i_do_next_time or "",
+            mistake.additional_techniques or "",
+            mistake.relevant_concept or "",
+            mistake.total_attempts or 0,
+            mistake.repetition_count or 0,
+            "Yes" if mistake.mastered else "No",
+            "Yes" if mistake.got_correct else "No",
+            # isoformat with sep/timespec renders the same "YYYY-MM-DD HH:MM:SS"
+            # as strftime without reparsing a format string per row
+            mistake.next_review_date.isoformat(sep=' ', timespec='seconds') if mistake.next_review_date else "",
+            mistake.created_at.isoformat(sep=' ', timespec='seconds') if mistake.created_at else "",
+        ]
+        if styled:
+            row = []
+            for value, alignment in zip(values, _MISTAKES_ALIGNMENTS):
+                cell = WriteOnlyCell(ws, value=value)
+                cell.border = _BORDER
+                cell.alignment = alignment
+                row.append(cell)
+            ws.append(row)
+        else:
+            ws.append(values)
+
     # Save to bytes
     output = io.BytesIO()
     wb.save(output)
@@ -116,7 +189,65 @@ def export_to_excel(mistakes: List['GREMistake']) -> bytes:
     return output.getvalue()
 
 
-def export_to_pdf(mistakes: List['GREMistake']) -> bytes:
+def _trunc(s, n=500):
+    """Truncate long text with an ellipsis; short text passes through unsliced."""
+    if s is None or len(s) <= n:
+        return s or ""
+    return s[:n] + "..."
+
+
+def _mistakes_table(mistakes: List['Row']) -> LongTable:
+    """Build one section's mistakes as a single LongTable flowable."""
+    data = [[
+        Paragraph(header, _PDF_CELL_HEADER_STYLE)
+        for header in ("ID", "Topic", "Error Type", "Problem", "Solution", "Notes", "Progress")
+    ]]
+    for mistake in mistakes:
+        # User text is escaped so reportlab's mini-XML parser never sees
+        # stray angle brackets as markup; only our own <b>/<br/> tags remain
+        topic = escape(mistake.topic)
+        if mistake.sub_topic:
+            topic += f" / {escape(mistake.sub_topic)}"
+        if mistake.kmf_section:
+            topic += f"<br/>KMF {mistake.kmf_section}"
+            if mistake.kmf_problem_set:
+                topic += f".{mistake.kmf_problem_set}"
+
+        problem = escape(_trunc(mistake.problem_statement_text))
+        solution = escape(_trunc(mistake.solution_text))
+
+        notes = []
+        if mistake.what_did_i_do_wrong:
+            notes.append(f"<b>Wrong:</b> {escape(mistake.what_did_i_do_wrong)}")
+        if mistake.what_will_i_do_next_time:
+            notes.append(f"<b>Next time:</b> {escape(mistake.what_will_i_do_next_time)}")
+
+        progress = (
+            f"{mistake.total_attempts or 0} att<br/>"
+            f"{mistake.repetition_count or 0}/5<br/>"
+            f"{'Mastered' if mistake.mastered else 'Learning'}"
+        )
+
+        data.append([
+            Paragraph(str(mistake.id), _PDF_CELL_STYLE),
+            Paragraph(topic, _PDF_CELL_STYLE),
+            Paragraph(escape(mistake.error_type), _PDF_CELL_STYLE),
+            Paragraph(problem, _PDF_CELL_STYLE),
+            Paragraph(solution, _PDF_CELL_STYLE),
+            Paragraph("<br/>".join(notes), _PDF_CELL_STYLE),
+            Paragraph(progress, _PDF_CELL_STYLE),
+        ])
+
+    table = LongTable(
+        data,
+        colWidths=[0.4*inch, 1.0*inch, 0.65*inch, 1.65*inch, 1.65*inch, 1.35*inch, 0.6*inch],
+        repeatRows=1,
+    )
+    table.setStyle(_MISTAKES_TABLE_STYLE)
+    return table
+
+
+def export_to_pdf(mistakes: List['Row']) -> bytes:
     """Export mistakes to PDF format."""
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
@@ -124,187 +255,89 @@ def export_to_pdf(mistakes: List['GREMistake']) -> bytes:
     # Container for the 'Flowable' objects
     elements = []
     
-    # Define styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=30,
-        alignment=1  # Center alignment
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#366092'),
-        spaceAfter=12,
-        spaceBefore=20
-    )
-    
-    normal_style = styles['Normal']
-    normal_style.fontSize = 10
-    normal_style.leading = 14
-    
+    title_style = _PDF_TITLE_STYLE
+    heading_style = _MISTAKES_HEADING_STYLE
+    normal_style = _PDF_NORMAL_STYLE
+
     # Title
     elements.append(Paragraph("GRE Mistakes Export", title_style))
     elements.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", normal_style))
     elements.append(Paragraph(f"Total Mistakes: {len(mistakes)}", normal_style))
     elements.append(Spacer(1, 0.3*inch))
     
-    # Group mistakes by section
-    quant_mistakes = [m for m in mistakes if m.section == "Quant"]
-    verbal_mistakes = [m for m in mistakes if m.section == "Verbal"]
-    
-    # Quant Section
+    # Partition by section in one pass instead of two filtering comprehensions
+    quant_mistakes, verbal_mistakes = [], []
+    for m in mistakes:
+        (quant_mistakes if m.section == "Quant" else verbal_mistakes).append(m)
+
+    # One LongTable flowable per section instead of ~10 Paragraphs per
+    # mistake; LongTable lays out incrementally and repeatRows=1 re-draws
+    # the header after page breaks, so no manual PageBreak bookkeeping
     if quant_mistakes:
         elements.append(Paragraph("Quantitative Section", heading_style))
-        for idx, mistake in enumerate(quant_mistakes, 1):
-            elements.append(Paragraph(f"<b>Mistake {idx} (ID: {mistake.id})</b>", normal_style))
-            elements.append(Paragraph(f"<b>Topic:</b> {mistake.topic}", normal_style))
-            if mistake.sub_topic:
-                elements.append(Paragraph(f"<b>Sub Topic:</b> {mistake.sub_topic}", normal_style))
-            if mistake.kmf_section:
-                elements.append(Paragraph(f"<b>KMF Section:</b> {mistake.kmf_section}", normal_style))
-            if mistake.kmf_problem_set:
-                elements.append(Paragraph(f"<b>KMF Problem Set:</b> {mistake.kmf_problem_set}", normal_style))
-            elements.append(Paragraph(f"<b>Error Type:</b> {mistake.error_type}", normal_style))
-            
-            if mistake.problem_statement_text:
-                elements.append(Paragraph("<b>Problem Statement:</b>", normal_style))
-                elements.append(Paragraph(mistake.problem_statement_text[:500] + ("..." if len(mistake.problem_statement_text) > 500 else ""), normal_style))
-            
-            if mistake.solution_text:
-                elements.append(Paragraph("<b>Solution:</b>", normal_style))
-                elements.append(Paragraph(mistake.solution_text[:500] + ("..." if len(mistake.solution_text) > 500 else ""), normal_style))
-            
-            if mistake.what_did_i_do_wrong:
-                elements.append(Paragraph("<b>What Did I Do Wrong:</b>", normal_style))
-                elements.append(Paragraph(mistake.what_did_i_do_wrong, normal_style))
-            
-            if mistake.what_will_i_do_next_time:
-                elements.append(Paragraph("<b>What Will I Do Next Time:</b>", normal_style))
-                elements.append(Paragraph(mistake.what_will_i_do_next_time, normal_style))
-            
-            elements.append(Paragraph(f"<b>Attempts:</b> {mistake.total_attempts or 0} | <b>Repetitions:</b> {mistake.repetition_count or 0}/5 | <b>Mastered:</b> {'Yes' if mistake.mastered else 'No'}", normal_style))
-            elements.append(Spacer(1, 0.2*inch))
-        
-        if verbal_mistakes:
-            elements.append(PageBreak())
-    
-    # Verbal Section
+        elements.append(_mistakes_table(quant_mistakes))
+
     if verbal_mistakes:
         elements.append(Paragraph("Verbal Section", heading_style))
-        for idx, mistake in enumerate(verbal_mistakes, 1):
-            elements.append(Paragraph(f"<b>Mistake {idx} (ID: {mistake.id})</b>", normal_style))
-            elements.append(Paragraph(f"<b>Topic:</b> {mistake.topic}", normal_style))
-            if mistake.sub_topic:
-                elements.append(Paragraph(f"<b>Sub Topic:</b> {mistake.sub_topic}", normal_style))
-            if mistake.kmf_section:
-                elements.append(Paragraph(f"<b>KMF Section:</b> {mistake.kmf_section}", normal_style))
-            if mistake.kmf_problem_set:
-                elements.append(Paragraph(f"<b>KMF Problem Set:</b> {mistake.kmf_problem_set}", normal_style))
-            elements.append(Paragraph(f"<b>Error Type:</b> {mistake.error_type}", normal_style))
-            
-            if mistake.problem_statement_text:
-                elements.append(Paragraph("<b>Problem Statement:</b>", normal_style))
-                elements.append(Paragraph(mistake.problem_statement_text[:500] + ("..." if len(mistake.problem_statement_text) > 500 else ""), normal_style))
-            
-            if mistake.solution_text:
-                elements.append(Paragraph("<b>Solution:</b>", normal_style))
-                elements.append(Paragraph(mistake.solution_text[:500] + ("..." if len(mistake.solution_text) > 500 else ""), normal_style))
-            
-            if mistake.what_did_i_do_wrong:
-                elements.append(Paragraph("<b>What Did I Do Wrong:</b>", normal_style))
-                elements.append(Paragraph(mistake.what_did_i_do_wrong, normal_style))
-            
-            if mistake.what_will_i_do_next_time:
-                elements.append(Paragraph("<b>What Will I Do Next Time:</b>", normal_style))
-                elements.append(Paragraph(mistake.what_will_i_do_next_time, normal_style))
-            
-            elements.append(Paragraph(f"<b>Attempts:</b> {mistake.total_attempts or 0} | <b>Repetitions:</b> {mistake.repetition_count or 0}/5 | <b>Mastered:</b> {'Yes' if mistake.mastered else 'No'}", normal_style))
-            elements.append(Spacer(1, 0.2*inch))
-    
+        elements.append(_mistakes_table(verbal_mistakes))
+
     # Build PDF
     doc.build(elements)
     buffer.seek(0)
     return buffer.getvalue()
 
 
-def export_vocabulary_to_excel(vocabulary: List['Vocabulary']) -> bytes:
+def export_vocabulary_to_excel(vocabulary: List['Row']) -> bytes:
     """Export vocabulary to Excel format."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Vocabulary"
-    
+    # Same write-only streaming as export_to_excel
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Vocabulary")
+
     # Header row
     headers = [
         "ID", "Word", "Set No", "Category", "Meaning", "Synonym",
         "Sentences", "Genre", "Tags", "Source Mistake ID", "Created At"
     ]
-    
-    # Style header
-    header_fill = PatternFill(start_color="7C3AED", end_color="7C3AED", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        cell.border = border
-    
-    # Data rows
-    for row_num, vocab in enumerate(vocabulary, 2):
-        ws.cell(row=row_num, column=1, value=vocab.id).border = border
-        ws.cell(row=row_num, column=2, value=vocab.word).border = border
-        ws.cell(row=row_num, column=3, value=vocab.set_no or "").border = border
-        ws.cell(row=row_num, column=4, value=vocab.category or "").border = border
-        ws.cell(row=row_num, column=5, value=vocab.meaning).border = border
-        ws.cell(row=row_num, column=6, value=vocab.synonym or "").border = border
-        ws.cell(row=row_num, column=7, value=vocab.sentences or "").border = border
-        ws.cell(row=row_num, column=8, value=vocab.genre or "").border = border
-        ws.cell(row=row_num, column=9, value=", ".join(vocab.tags) if vocab.tags else "").border = border
-        ws.cell(row=row_num, column=10, value=vocab.source_mistake_id or "").border = border
-        ws.cell(row=row_num, column=11, value=vocab.created_at.strftime("%Y-%m-%d %H:%M:%S") if vocab.created_at else "").border = border
-        
-        # Set alignment for text cells
-        for col in range(1, 12):
-            cell = ws.cell(row=row_num, column=col)
-            if col in [5, 6, 7]:  # Meaning, Synonym, Sentences
-                cell.alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
-            else:
-                cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    
-    # Auto-adjust column widths
-    column_widths = {
-        1: 8,   # ID
-        2: 20,  # Word
-        3: 10,  # Set No
-        4: 15,  # Category
-        5: 40,  # Meaning
-        6: 30,  # Synonym
-        7: 40,  # Sentences
-        8: 15,  # Genre
-        9: 25,  # Tags
-        10: 15, # Source Mistake ID
-        11: 20, # Created At
-    }
-    
-    for col_num, width in column_widths.items():
+
+    fill = _VOCAB_HEADER_FILL
+
+    column_widths = [8, 20, 10, 15, 40, 30, 40, 15, 25, 15, 20]
+    for col_num, width in enumerate(column_widths, 1):
         ws.column_dimensions[get_column_letter(col_num)].width = width
-    
-    # Freeze header row
     ws.freeze_panes = "A2"
-    
+
+    header_row = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.fill = fill
+        cell.font = _HEADER_FONT
+        cell.alignment = _CENTER_ALIGN
+        cell.border = _BORDER
+        header_row.append(cell)
+    ws.append(header_row)
+
+    for vocab in vocabulary:
+        values = [
+            vocab.id,
+            vocab.word,
+            vocab.set_no or "",
+            vocab.category or "",
+            vocab.meaning,
+            vocab.synonym or "",
+            vocab.sentences or "",
+            vocab.genre or "",
+            ", ".join(vocab.tags) if vocab.tags else "",
+            vocab.source_mistake_id or "",
+            vocab.created_at.isoformat(sep=' ', timespec='seconds') if vocab.created_at else "",
+        ]
+        row = []
+        for value, alignment in zip(values, _VOCAB_ALIGNMENTS):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.border = _BORDER
+            cell.alignment = alignment
+            row.append(cell)
+        ws.append(row)
+
     # Save to bytes
     output = io.BytesIO()
     wb.save(output)
@@ -312,7 +345,7 @@ def export_vocabulary_to_excel(vocabulary: List['Vocabulary']) -> bytes:
     return output.getvalue()
 
 
-def export_vocabulary_to_pdf(vocabulary: List['Vocabulary']) -> bytes:
+def export_vocabulary_to_pdf(vocabulary: List['Row']) -> bytes:
     """Export vocabulary to PDF format."""
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
@@ -320,98 +353,50 @@ def export_vocabulary_to_pdf(vocabulary: List['Vocabulary']) -> bytes:
     # Container for the 'Flowable' objects
     elements = []
     
-    # Define styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=30,
-        alignment=1  # Center alignment
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#7C3AED'),
-        spaceAfter=12,
-        spaceBefore=20
-    )
-    
-    normal_style = styles['Normal']
-    normal_style.fontSize = 10
-    normal_style.leading = 14
-    
+    # Module-level styles, same as the mistakes export; in particular no
+    # mutation of the stylesheet's shared 'Normal' entry per call
+    title_style = _PDF_TITLE_STYLE
+    heading_style = _VOCAB_HEADING_STYLE
+    normal_style = _PDF_NORMAL_STYLE
+
+
     # Title
     elements.append(Paragraph("Vocabulary Export", title_style))
     elements.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", normal_style))
     elements.append(Paragraph(f"Total Vocabulary Entries: {len(vocabulary)}", normal_style))
     elements.append(Spacer(1, 0.3*inch))
     
-    # Group vocabulary by set_no if available
-    grouped_vocab = {}
-    ungrouped_vocab = []
-    
-    for vocab in vocabulary:
-        if vocab.set_no:
-            if vocab.set_no not in grouped_vocab:
-                grouped_vocab[vocab.set_no] = []
-            grouped_vocab[vocab.set_no].append(vocab)
-        else:
-            ungrouped_vocab.append(vocab)
-    
-    # Grouped by Set No
-    if grouped_vocab:
-        for set_no in sorted(grouped_vocab.keys()):
-            vocab_list = grouped_vocab[set_no]
-            elements.append(Paragraph(f"Set {set_no} ({len(vocab_list)} entries)", heading_style))
-            
-            for idx, vocab in enumerate(vocab_list, 1):
-                elements.append(Paragraph(f"<b>{idx}. {vocab.word}</b>", normal_style))
-                elements.append(Paragraph(f"<b>Meaning:</b> {vocab.meaning}", normal_style))
-                
-                if vocab.synonym:
-                    elements.append(Paragraph(f"<b>Synonym:</b> {vocab.synonym}", normal_style))
-                
-                if vocab.sentences:
-                    elements.append(Paragraph(f"<b>Example Sentences:</b> {vocab.sentences}", normal_style))
-                
-                # Metadata
-                metadata_parts = []
-                if vocab.category:
-                    metadata_parts.append(f"Category: {vocab.category}")
-                if vocab.genre:
-                    metadata_parts.append(f"Genre: {vocab.genre}")
-                if vocab.tags:
-                    metadata_parts.append(f"Tags: {', '.join(vocab.tags)}")
-                
-                if metadata_parts:
-                    elements.append(Paragraph(f"<i>{' | '.join(metadata_parts)}</i>", normal_style))
-                
-                elements.append(Spacer(1, 0.15*inch))
-            
-            if set_no < max(grouped_vocab.keys()) or ungrouped_vocab:
-                elements.append(PageBreak())
-    
-    # Ungrouped vocabulary
-    if ungrouped_vocab:
-        if grouped_vocab:
-            elements.append(Paragraph("Other Vocabulary", heading_style))
+    # The caller orders by (set_no NULLS LAST, word), so one groupby pass
+    # yields the sets in order with unnumbered words at the end — no dict
+    # build or key sort here
+    groups = [(set_no, list(items))
+              for set_no, items in groupby(vocabulary, key=attrgetter('set_no'))]
+
+    for group_idx, (set_no, vocab_list) in enumerate(groups):
+        if group_idx:
+            elements.append(PageBreak())
+        if set_no is not None:
+            heading = f"Set {set_no} ({len(vocab_list)} entries)"
+        elif group_idx:
+            heading = "Other Vocabulary"
         else:
-            elements.append(Paragraph("Vocabulary Entries", heading_style))
-        
-        for idx, vocab in enumerate(ungrouped_vocab, 1):
-            elements.append(Paragraph(f"<b>{idx}. {vocab.word}</b>", normal_style))
-            elements.append(Paragraph(f"<b>Meaning:</b> {vocab.meaning}", normal_style))
-            
+            heading = "Vocabulary Entries"
+        elements.append(Paragraph(heading, heading_style))
+
+        for idx, vocab in enumerate(vocab_list, 1):
+            # One Paragraph per entry: a single paraparser pass over the
+            # joined lines instead of one per label, with user text escaped
+            parts = [
+                f"<b>{idx}. {escape(vocab.word)}</b>",
+                f"<b>Meaning:</b> {escape(vocab.meaning)}",
+            ]
+
             if vocab.synonym:
-                elements.append(Paragraph(f"<b>Synonym:</b> {vocab.synonym}", normal_style))
-            
+                parts.append(f"<b>Synonym:</b> {escape(vocab.synonym)}")
+
             if vocab.sentences:
-                elements.append(Paragraph(f"<b>Example Sentences:</b> {vocab.sentences}", normal_style))
-            
+                parts.append(f"<b>Example Sentences:</b> {escape(vocab.sentences)}")
+
             # Metadata
             metadata_parts = []
             if vocab.category:
@@ -420,12 +405,13 @@ def export_vocabulary_to_pdf(vocabulary: List['Vocabulary']) -> bytes:
                 metadata_parts.append(f"Genre: {vocab.genre}")
             if vocab.tags:
                 metadata_parts.append(f"Tags: {', '.join(vocab.tags)}")
-            
+
             if metadata_parts:
-                elements.append(Paragraph(f"<i>{' | '.join(metadata_parts)}</i>", normal_style))
-            
+                parts.append(f"<i>{escape(' | '.join(metadata_parts))}</i>")
+
+            elements.append(Paragraph("<br/>".join(parts), normal_style))
             elements.append(Spacer(1, 0.15*inch))
-    
+
     # Build PDF
     doc.build(elements)
     buffer.seek(0)
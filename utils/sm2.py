@@ -3,8 +3,46 @@ SM-2 Spaced Repetition Algorithm Implementation
 Based on SuperMemo 2 algorithm for calculating next review dates.
 """
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Tuple
 
+from sqlalchemy import Integer, Text, case, cast, func, literal, text
+
+
+@lru_cache(maxsize=65536)
+def _sm2_core(
+    quality: int,
+    interval: int,
+    ease_int: int,
+    repetition_count: int
+) -> Tuple[int, int, int]:
+    """
+    One SM-2 state transition on integer state, memoized.
+
+    Review inputs cluster around a small state space (quality 1-5, low
+    repetition counts, bounded intervals), so most calls are cache hits.
+    The ease factor travels as hundredths (ease_int = round(ef * 100)) to
+    keep the cache key exact; float keys would fragment the cache with
+    near-equal values.
+
+    Returns (new_interval, new_ease_int, new_repetition_count).
+    """
+    if quality < 3:
+        # Failed recall: reset the schedule, keep the ease factor
+        return 1, ease_int, 0
+
+    new_ease_int = max(
+        130,
+        ease_int + round((0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)) * 100),
+    )
+    new_interval = (
+        (1, 6)[repetition_count] if repetition_count < 2
+        else interval * new_ease_int // 100
+    )
+
+    return new_interval, new_ease_int, repetition_count + 1
+
+
 def calculate_next_review(
     quality: int,
     interval: int,
@@ -28,30 +66,102 @@ def calculate_next_review(
     Returns:
         Tuple of (new_interval, new_ease_factor, new_repetition_count, next_review_date)
     """
+    new_interval, new_ease_int, new_repetition_count = _sm2_core(
+        quality, interval, round(ease_factor * 100), repetition_count
+    )
+
+    # Only the non-deterministic part stays outside the cached core
+    next_review_date = datetime.now() + timedelta(days=new_interval)
+
+    return new_interval, new_ease_int / 100, new_repetition_count, next_review_date
+
+
+def calculate_next_review_batch(quality, interval, ease_factor, repetition_count):
+    """
+    Vectorized SM-2 transition over aligned NumPy arrays.
+
+    Same transition as calculate_next_review, one NumPy op per step
+    instead of one interpreter round-trip per row — for bulk jobs such
+    as recomputing schedules after an import. NumPy is imported here
+    rather than at module load so the API path never pays for it (it is
+    not a runtime dependency of the service).
+
+    Returns (new_interval, new_ease_factor, new_repetition_count) arrays.
+    """
+    import numpy as np
+
+    quality = np.asarray(quality)
+    interval = np.asarray(interval)
+    ease_factor = np.asarray(ease_factor)
+    repetition_count = np.asarray(repetition_count)
+
+    passed = quality >= 3
+    new_ease_factor = np.where(
+        passed,
+        np.maximum(1.3, ease_factor + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)),
+        ease_factor,
+    )
+    grown = np.where(
+        repetition_count == 0, 1,
+        np.where(repetition_count == 1, 6,
+                 (interval * new_ease_factor).astype(np.int64)),
+    )
+    new_interval = np.where(passed, grown, 1)
+    new_repetition_count = np.where(passed, repetition_count + 1, 0)
+
+    return new_interval, new_ease_factor, new_repetition_count
+
+
+def sm2_update_values(quality: int, dialect: str) -> dict:
+    """
+    SM-2 review step as SQL column expressions for a single UPDATE.
+
+    Same transition as calculate_next_review, but expressed against the
+    stored columns so the review handler can apply it in one
+    UPDATE ... RETURNING without reading the row first. quality is known
+    in Python, so the branch on it happens here; everything depending on
+    the stored state (ease factor, interval, repetition count) stays SQL.
+
+    Args:
+        quality: User-reported quality score (1-5)
+        dialect: engine.dialect.name, for the date-arithmetic syntax
+
+    Returns:
+        Dict of column -> expression for update(GREMistake).values()
+    """
+    from app.models import GREMistake
+
+    values = {
+        "total_attempts": func.coalesce(GREMistake.total_attempts, 0) + 1,
+    }
+    if quality >= 4:
+        values["got_correct"] = True
+
     if quality < 3:
-        # If quality < 3, reset the interval
-        new_interval = 1
-        new_repetition_count = 0
+        # Failed recall: reset the schedule, keep the ease factor
+        new_interval = literal(1)
+        values["interval"] = 1
+        values["repetition_count"] = 0
     else:
-        # Calculate new ease factor
-        new_ease_factor = ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
-        
-        # Ensure ease factor doesn't go below 1.3
-        if new_ease_factor < 1.3:
-            new_ease_factor = 1.3
-        
-        # Calculate new interval
-        if repetition_count == 0:
-            new_interval = 1
-        elif repetition_count == 1:
-            new_interval = 6
-        else:
-            new_interval = int(interval * new_ease_factor)
-        
-        new_repetition_count = repetition_count + 1
-    
-    # Calculate next review date
-    next_review_date = datetime.now() + timedelta(days=new_interval)
-    
-    return new_interval, new_ease_factor, new_repetition_count, next_review_date
+        delta = 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+        raised = GREMistake.ease_factor + delta
+        new_ease_factor = case((raised < 1.3, 1.3), else_=raised)
+        new_interval = case(
+            (GREMistake.repetition_count == 0, 1),
+            (GREMistake.repetition_count == 1, 6),
+            else_=cast(GREMistake.interval * new_ease_factor, Integer),
+        )
+        values["ease_factor"] = new_ease_factor
+        values["interval"] = new_interval
+        values["repetition_count"] = GREMistake.repetition_count + 1
+        values["mastered"] = GREMistake.repetition_count + 1 >= 5
+
+    if dialect == "postgresql":
+        values["next_review_date"] = func.now() + new_interval * text("interval '1 day'")
+    else:
+        values["next_review_date"] = func.datetime(
+            "now", "localtime", literal("+") + cast(new_interval, Text) + literal(" days")
+        )
+
+    return values
 